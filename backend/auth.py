@@ -1,64 +1,121 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Optional
-from jose import JWTError, jwt
+from typing import Annotated, Optional
+import jwt
+from jwt import InvalidTokenError
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from motor.motor_asyncio import AsyncIOMotorDatabase
+import asyncio
 import os
+import secrets
+import time
+from cache import TTLCache
+from dependencies import get_database
+from pos_models import UserRole  # noqa: F401 (re-exported)
 
 # Security configurations
 SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'your-secret-key-change-in-production')
 ALGORITHM = 'HS256'
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24 hours
 
-pwd_context = CryptContext(schemes=['bcrypt'], deprecated='auto')
+BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', 10))
+
+# Hashes made with a higher cost are flagged by needs_update and rehashed on login
+pwd_context = CryptContext(
+    schemes=['bcrypt'],
+    bcrypt__rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+    deprecated='auto',
+)
+# bcrypt runs on its own small pool so a burst of logins cannot starve the
+# default executor used for other blocking work
+_hash_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get('PASSWORD_HASH_WORKERS', 4)),
+    thread_name_prefix='password-hash',
+)
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
-class UserRole:
-    SUPER_ADMIN = 'super_admin'
-    BRANCH_ADMIN = 'branch_admin'
-    MANAGER = 'manager'
-    STAFF = 'staff'
+# Decoded payloads of already verified tokens, kept until the token expires
+_token_cache = TTLCache(maxsize=10_000, ttl=ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+# Recently loaded user documents (without password), keyed by user id
+USER_CACHE_TTL = 60
+_user_cache = TTLCache(maxsize=10_000, ttl=USER_CACHE_TTL)
+# Revocations live in the revoked_tokens collection so every worker sees them
+# (a TTL index drops each one when its token expires). Lookups are cached by
+# jti: "revoked" until the token expires, since that is permanent, and "not
+# revoked" for USER_CACHE_TTL, so another worker's logout is picked up within
+# the same window as any other user change.
+_revocation_cache = TTLCache(maxsize=100_000, ttl=USER_CACHE_TTL)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain password against a hashed password"""
     return pwd_context.verify(plain_password, hashed_password)
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple:
+    """Verify a password and return (valid, new_hash) where new_hash is set if the hash should be upgraded"""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
 def get_password_hash(password: str) -> str:
     """Hash a password"""
     return pwd_context.hash(password)
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password run on the password hashing pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, verify_password, plain_password, hashed_password)
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> tuple:
+    """verify_and_update_password run on the password hashing pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, verify_and_update_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash run on the password hashing pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, get_password_hash, password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token"""
     to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.now(timezone.utc) + expires_delta
-    else:
-        expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    if expires_delta is None:
+        expires_delta = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    # exp as the integer timestamp PyJWT would produce from a datetime anyway
+    expire = int(time.time() + expires_delta.total_seconds())
     
-    to_encode.update({'exp': expire})
+    # jti makes every token unique so logout can revoke exactly one
+    to_encode.update({'exp': expire, 'jti': secrets.token_hex(8)})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    # We just signed it, so the client's first request needn't verify it again
+    _token_cache.set(encoded_jwt, to_encode, ttl=expire - time.time())
     return encoded_jwt
 
 def decode_token(token: str) -> dict:
-    """Decode a JWT token"""
+    """Decode a JWT token, reusing the payload of a previously verified token"""
+    payload = _token_cache.get(token)
+    if payload is not None:
+        return payload
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
-    except JWTError:
+    except InvalidTokenError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail='Could not validate credentials',
             headers={'WWW-Authenticate': 'Bearer'},
         )
+    exp = payload.get('exp')
+    if exp is not None:
+        _token_cache.set(token, payload, ttl=exp - time.time())
+    return payload
 
 async def get_current_user_dependency(credentials: HTTPAuthorizationCredentials = Depends(security)):
     """Get the current authenticated user - use this in routes"""
-    from dependencies import get_database
-    
     token = credentials.credentials
     payload = decode_token(token)
+    # Checked on cached payloads too, since another worker may have revoked it
+    await ensure_not_revoked(payload)
     
     user_id: str = payload.get('sub')
     if user_id is None:
@@ -67,20 +124,74 @@ async def get_current_user_dependency(credentials: HTTPAuthorizationCredentials
             detail='Could not validate credentials',
         )
     
-    db = get_database()
-    user = await db.users.find_one({'id': user_id}, {'_id': 0})
+    user = _user_cache.get(user_id)
     if user is None:
+        db = get_database()
+        user = await db.users.find_one({'id': user_id}, {'_id': 0, 'password': 0})
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail='User not found',
+            )
+        _user_cache.set(user_id, user)
+    
+    return dict(user)
+
+# Shared annotation for routes that need the authenticated user
+CurrentUser = Annotated[dict, Depends(get_current_user_dependency)]
+
+def cache_user(user: dict) -> None:
+    """Prime the lookup cache with a freshly loaded user document"""
+    user = dict(user)
+    user.pop('password', None)
+    _user_cache.set(user['id'], user)
+
+def invalidate_cached_user(user_id: str) -> None:
+    """Drop a user from the lookup caches after it has been modified or deleted"""
+    _user_cache.pop(user_id)
+
+async def ensure_not_revoked(payload: dict) -> None:
+    """Raise 401 if the token with this payload has been revoked by any worker"""
+    jti = payload.get('jti')
+    if jti is None:
+        return
+    revoked = _revocation_cache.get(jti)
+    if revoked is None:
+        db = get_database()
+        revoked = bool(await db.revoked_tokens.count_documents({'jti': jti}, limit=1))
+        ttl = payload.get('exp', 0) - time.time() if revoked else None
+        _revocation_cache.set(jti, revoked, ttl=ttl)
+    if revoked:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail='User not found',
+            detail='Token has been revoked',
+            headers={'WWW-Authenticate': 'Bearer'},
         )
-    
-    return user
+
+async def revoke_token(token: str) -> None:
+    """Reject a token, in every worker, for the rest of its lifetime"""
+    try:
+        payload = decode_token(token)
+    except HTTPException:
+        return
+    _token_cache.pop(token)
+    jti, exp = payload.get('jti'), payload.get('exp')
+    if jti is None or exp is None:
+        return
+    # Overwrites a cached "not revoked" so this worker rejects it right away
+    _revocation_cache.set(jti, True, ttl=exp - time.time())
+    db = get_database()
+    await db.revoked_tokens.update_one(
+        {'jti': jti},
+        {'$setOnInsert': {'expires_at': datetime.fromtimestamp(exp, timezone.utc)}},
+        upsert=True,
+    )
 
 def require_role(allowed_roles: list):
     """Dependency to check if user has required role"""
-    async def role_checker(credentials: HTTPAuthorizationCredentials = Depends(security)):
-        user = await get_current_user_dependency(credentials)
+    # Depending on get_current_user_dependency (rather than calling it) lets
+    # FastAPI resolve the user once per request however many guards a route uses
+    async def role_checker(user: CurrentUser):
         if user['role'] not in allowed_roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
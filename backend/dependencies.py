@@ -1,16 +1,80 @@
 from fastapi import Depends
 from motor.motor_asyncio import AsyncIOMotorDatabase
+import asyncio
 import os
+from functools import lru_cache
+from pathlib import Path
+from dotenv import load_dotenv
 from motor.motor_asyncio import AsyncIOMotorClient
 
-# Database dependency
-client = None
+# Loaded here rather than in the app modules: this module (directly or through
+# auth) is imported before anything reads a setting at import time, so values
+# in backend/.env reach the pool options below and auth's bcrypt settings too
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
 
+# Connection pool settings: keep warm connections, drop long idle ones and
+# compress wire traffic when the server supports it. The pool is per worker
+# process, so size MONGO_MAX_POOL with WEB_CONCURRENCY in mind. A request
+# waiting longer than MONGO_WAIT_QUEUE_TIMEOUT_MS for a connection fails fast
+# instead of queueing behind an exhausted pool.
+MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL', 50))
+
+CLIENT_OPTIONS = {
+    "tz_aware": True,
+    "maxPoolSize": MAX_POOL_SIZE,
+    # Never above the max, which pymongo rejects, when only the max is lowered
+    "minPoolSize": min(int(os.environ.get('MONGO_MIN_POOL', 10)), MAX_POOL_SIZE),
+    "maxIdleTimeMS": 300_000,
+    "waitQueueTimeoutMS": int(os.environ.get('MONGO_WAIT_QUEUE_TIMEOUT_MS', 1000)),
+    "serverSelectionTimeoutMS": 5000,
+    "retryWrites": True,
+    "compressors": "zstd",
+}
+
+def create_client() -> AsyncIOMotorClient:
+    """Create a MongoDB client with the tuned connection pool"""
+    return AsyncIOMotorClient(os.environ['MONGO_URL'], **CLIENT_OPTIONS)
+
+@lru_cache
+def get_client() -> AsyncIOMotorClient:
+    """Get the MongoDB client shared by every module of the app"""
+    return create_client()
+
+@lru_cache
 def get_database() -> AsyncIOMotorDatabase:
     """Get database instance"""
-    global client
-    if client is None:
-        mongo_url = os.environ['MONGO_URL']
-        client = AsyncIOMotorClient(mongo_url)
-    db = client[os.environ['DB_NAME']]
-    return db
+    return get_client()[os.environ['DB_NAME']]
+
+def model_projection(model: type) -> dict:
+    """Build a Mongo projection fetching only the fields the model serializes"""
+    return {"_id": 0, **{field: 1 for field in model.model_fields}}
+
+# Indexes backing the hot lookups in the API routes: (keys, create_index options)
+INDEXES = {
+    "users": [("id", {"unique": True}), ("email", {"unique": True})],
+    "restaurants": [("id", {"unique": True}), ("owner_id", {})],
+    "branches": [("id", {"unique": True}), ([("restaurant_id", 1), ("id", 1)], {})],
+    "categories": [("id", {"unique": True}), ("branch_id", {})],
+    "subcategories": [("id", {"unique": True}), ([("category_id", 1), ("id", 1)], {})],
+    "menu_items": [("id", {"unique": True}), ([("category_id", 1), ("availability", 1)], {})],
+    "tables": [("id", {"unique": True})],
+    "orders": [
+        ("id", {"unique": True}),
+        ([("created_at", -1), ("_id", -1)], {}),
+        ([("order_status", 1), ("created_at", -1), ("_id", -1)], {}),
+        ([("order_status", 1), ("table_id", 1), ("created_at", -1), ("_id", -1)], {}),
+        ("table_id", {}),
+    ],
+    "reservations": [([("reservation_date", -1), ("_id", 1)], {})],
+    # Logged out tokens; MongoDB deletes each entry once its token has expired
+    "revoked_tokens": [("jti", {"unique": True}), ("expires_at", {"expireAfterSeconds": 0})],
+}
+
+async def ensure_indexes(db: AsyncIOMotorDatabase) -> None:
+    """Create the indexes in INDEXES (no-op for indexes that already exist)"""
+    await asyncio.gather(*(
+        db[collection].create_index(keys, **options)
+        for collection, indexes in INDEXES.items()
+        for keys, options in indexes
+    ))
@@ -0,0 +1,34 @@
+import uuid
+
+# Middleware here is written as plain ASGI callables rather than with
+# BaseHTTPMiddleware / @app.middleware("http"), which wrap every request in an
+# extra Request/Response pair and task.
+
+REQUEST_ID_HEADER = b"x-request-id"
+
+class RequestIdMiddleware:
+    """Echo the client's X-Request-ID (or a generated one) on every HTTP response"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == REQUEST_ID_HEADER:
+                request_id = value
+                break
+        if request_id is None:
+            request_id = uuid.uuid4().hex.encode()
+        scope.setdefault("state", {})["request_id"] = request_id.decode("latin-1")
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), (REQUEST_ID_HEADER, request_id)]
+            await send(message)
+
+        await self.app(scope, receive, send_with_request_id)
@@ -0,0 +1,66 @@
+"""One-off migration converting ISO-8601 string timestamps to native BSON dates.
+
+Run once after deploying the native datetime storage change:
+
+    python migrate_datetimes.py
+"""
+import asyncio
+import os
+from datetime import datetime
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+# Collection -> datetime fields previously stored as isoformat() strings
+DATETIME_FIELDS = {
+    "users": ["created_at"],
+    "restaurants": ["created_at"],
+    "branches": ["created_at"],
+    "categories": ["created_at"],
+    "subcategories": ["created_at"],
+    "menu_items": ["created_at"],
+    "tables": ["created_at"],
+    "orders": ["created_at"],
+    "discounts": ["created_at", "start_date", "end_date"],
+    "reservations": ["created_at", "reservation_date"],
+}
+
+BATCH_SIZE = 1000
+
+async def migrate_collection(collection, fields: list) -> int:
+    """Convert string datetime fields of every document in a collection"""
+    query = {"$or": [{field: {"$type": "string"}} for field in fields]}
+    projection = {"_id": 1, **{field: 1 for field in fields}}
+    updated = 0
+    ops = []
+    async for doc in collection.find(query, projection):
+        changes = {
+            field: datetime.fromisoformat(doc[field])
+            for field in fields
+            if isinstance(doc.get(field), str)
+        }
+        ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": changes}))
+        if len(ops) >= BATCH_SIZE:
+            updated += (await collection.bulk_write(ops, ordered=False)).modified_count
+            ops = []
+    if ops:
+        updated += (await collection.bulk_write(ops, ordered=False)).modified_count
+    return updated
+
+async def main():
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[os.environ['DB_NAME']]
+    try:
+        for name, fields in DATETIME_FIELDS.items():
+            count = await migrate_collection(db[name], fields)
+            print(f"{name}: converted {count} documents")
+    finally:
+        client.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,232 @@
+from datetime import datetime, timezone
+from enum import Enum
+from functools import partial
+from typing import List, Optional
+import secrets
+import time
+from pydantic import BaseModel, Field, ConfigDict, EmailStr
+
+# ============ ENUMS ============
+
+# Defined here rather than in auth so importing the models does not pull in
+# passlib, PyJWT and Motor
+class UserRole:
+    SUPER_ADMIN = "super_admin"
+    BRANCH_ADMIN = "branch_admin"
+    MANAGER = "manager"
+    STAFF = "staff"
+
+class TableStatus(str, Enum):
+    AVAILABLE = "available"
+    OCCUPIED = "occupied"
+    RESERVED = "reserved"
+
+class OrderStatus(str, Enum):
+    PENDING = "pending"
+    PREPARING = "preparing"
+    READY = "ready"
+    SERVED = "served"
+    COMPLETED = "completed"
+    CANCELLED = "cancelled"
+
+class PaymentStatus(str, Enum):
+    PENDING = "pending"
+    PAID = "paid"
+    FAILED = "failed"
+
+class OrderType(str, Enum):
+    DINE_IN = "dine_in"
+    TAKEAWAY = "takeaway"
+    DELIVERY = "delivery"
+
+# ============ MODELS ============
+
+# Default factories are plain callables rather than lambdas
+
+# Random 32-char hex id straight from the OS CSPRNG, no UUID object; a C-level
+# partial adds no Python frame to model construction
+_gen_id = partial(secrets.token_hex, 16)
+
+# created_at only needs coarse precision, so a burst of models built within
+# _NOW_RESOLUTION seconds share one datetime instead of each building its own
+_NOW_RESOLUTION = 0.05
+_now_cache = [float('-inf'), None]
+
+def _now_utc() -> datetime:
+    """Current UTC time at BSON millisecond precision, refreshed every _NOW_RESOLUTION seconds"""
+    t = time.monotonic()
+    if t - _now_cache[0] > _NOW_RESOLUTION:
+        now = datetime.now(timezone.utc)
+        _now_cache[0] = t
+        _now_cache[1] = now.replace(microsecond=now.microsecond // 1000 * 1000)
+    return _now_cache[1]
+
+# ============ AUTH MODELS ============
+
+class UserRegister(BaseModel):
+    email: EmailStr
+    password: str
+    name: str
+    role: str = UserRole.STAFF
+    restaurant_id: Optional[str] = None
+    branch_id: Optional[str] = None
+
+class UserLogin(BaseModel):
+    email: EmailStr
+    password: str
+
+class User(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=_gen_id)
+    email: EmailStr
+    name: str
+    role: str
+    restaurant_id: Optional[str] = None
+    branch_id: Optional[str] = None
+    is_active: bool = True
+    created_at: datetime = Field(default_factory=_now_utc)
+
+class TokenResponse(BaseModel):
+    access_token: str
+    token_type: str = "bearer"
+    user: User
+
+# ============ RESTAURANT & BRANCH MODELS ============
+
+class RestaurantCreate(BaseModel):
+    name: str
+    contact: Optional[str] = None
+    email: Optional[str] = None
+    address: Optional[str] = None
+
+class Restaurant(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=_gen_id)
+    owner_id: str
+    name: str
+    contact: Optional[str] = None
+    email: Optional[str] = None
+    address: Optional[str] = None
+    is_active: bool = True
+    created_at: datetime = Field(default_factory=_now_utc)
+
+class BranchCreate(BaseModel):
+    restaurant_id: str
+    name: str
+    location: Optional[str] = None
+    contact: Optional[str] = None
+
+class Branch(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=_gen_id)
+    restaurant_id: str
+    name: str
+    location: Optional[str] = None
+    contact: Optional[str] = None
+    is_active: bool = True
+    created_at: datetime = Field(default_factory=_now_utc)
+
+# ============ EXISTING MODELS (Categories, Menu, Tables, Orders) ============
+
+class CategoryCreate(BaseModel):
+    name: str
+    branch_id: str
+    status: bool = True
+
+class Category(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=_gen_id)
+    branch_id: str
+    name: str
+    status: bool = True
+    created_at: datetime = Field(default_factory=_now_utc)
+
+class SubCategoryCreate(BaseModel):
+    category_id: str
+    branch_id: str
+    name: str
+    status: bool = True
+
+class SubCategory(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=_gen_id)
+    category_id: str
+    branch_id: str
+    name: str
+    status: bool = True
+    created_at: datetime = Field(default_factory=_now_utc)
+
+class MenuItemCreate(BaseModel):
+    branch_id: str
+    category_id: str
+    sub_category_id: Optional[str] = None
+    name: str
+    description: Optional[str] = None
+    price: float
+    tax: float = 0.0
+    availability: bool = True
+    image_url: Optional[str] = None
+
+class MenuItem(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=_gen_id)
+    branch_id: str
+    category_id: str
+    sub_category_id: Optional[str] = None
+    name: str
+    description: Optional[str] = None
+    price: float
+    tax: float = 0.0
+    availability: bool = True
+    image_url: Optional[str] = None
+    created_at: datetime = Field(default_factory=_now_utc)
+
+class TableCreate(BaseModel):
+    branch_id: str
+    table_name: str
+    capacity: int
+
+class Table(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=_gen_id)
+    branch_id: str
+    table_name: str
+    capacity: int
+    status: TableStatus = TableStatus.AVAILABLE
+    qr_url: Optional[str] = None
+    created_at: datetime = Field(default_factory=_now_utc)
+
+class OrderItem(BaseModel):
+    item_id: str
+    item_name: str
+    quantity: int
+    price: float
+    tax: float = 0.0
+
+class OrderCreate(BaseModel):
+    branch_id: str
+    table_id: Optional[str] = None
+    order_type: OrderType = OrderType.DINE_IN
+    items: List[OrderItem]
+    customer_name: Optional[str] = None
+    customer_phone: Optional[str] = None
+
+class Order(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=_gen_id)
+    branch_id: str
+    table_id: Optional[str] = None
+    order_type: OrderType = OrderType.DINE_IN
+    items: List[OrderItem]
+    customer_name: Optional[str] = None
+    customer_phone: Optional[str] = None
+    total_amount: float = 0.0
+    discount: float = 0.0
+    tax: float = 0.0
+    grand_total: float = 0.0
+    payment_status: PaymentStatus = PaymentStatus.PENDING
+    order_status: OrderStatus = OrderStatus.PENDING
+    created_at: datetime = Field(default_factory=_now_utc)
+
+class OrderStatusUpdate(BaseModel):
+    order_status: OrderStatus
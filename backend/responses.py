@@ -0,0 +1,17 @@
+import orjson
+from fastapi import responses
+
+# Pydantic writes UTC datetimes with a "Z" suffix while orjson writes "+00:00"
+# by default. Raw documents are serialized with OPT_UTC_Z so a timestamp reads
+# the same whether an endpoint returns models or stored documents.
+JSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_UTC_Z
+
+def json_dumps(content) -> bytes:
+    """Serialize to JSON bytes exactly like ORJSONResponse"""
+    return orjson.dumps(content, option=JSON_OPTIONS)
+
+class ORJSONResponse(responses.ORJSONResponse):
+    """FastAPI's ORJSONResponse, writing UTC datetimes in pydantic's "Z" form"""
+
+    def render(self, content) -> bytes:
+        return json_dumps(content)
@@ -1,33 +1,62 @@
-from fastapi import FastAPI, APIRouter, HTTPException, status, Depends
-from dotenv import load_dotenv
+from fastapi import FastAPI, APIRouter, BackgroundTasks, HTTPException, Query, Response, status, Depends
+from fastapi.security import HTTPAuthorizationCredentials
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from starlette.middleware.gzip import GZipMiddleware
+import asyncio
+import hashlib
 import os
 import logging
-from pathlib import Path
-from pydantic import BaseModel, Field, ConfigDict, EmailStr
+import time
+from pydantic import BaseModel, Field, ConfigDict, EmailStr, computed_field, conlist
 from typing import List, Optional
-import uuid
 from datetime import datetime, timezone
-import qrcode
+import segno
 import io
-import base64
+from functools import lru_cache
 from enum import Enum
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from cache import TTLCache
+from dependencies import get_client, get_database, ensure_indexes, model_projection
+from middleware import RequestIdMiddleware
+from responses import ORJSONResponse, json_dumps
 from auth import (
-    verify_password, get_password_hash, create_access_token,
-    get_current_user_dependency, require_role, UserRole
+    verify_and_update_password_async, get_password_hash_async, create_access_token,
+    CurrentUser, require_role, cache_user, invalidate_cached_user,
+    revoke_token, optional_security
 )
+from pos_models import UserRole
 
-ROOT_DIR = Path(__file__).parent
-load_dotenv(ROOT_DIR / '.env')
+# MongoDB connection (shared with the auth dependencies)
+db = get_database()
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# Page size bounds for list endpoints; pages are sorted on an indexed, unique
+# key (or end with _id as a tiebreaker) so skip/limit stays stable between
+# requests. The default is the old 1000-row cap because the frontend fetches
+# whole lists without paging.
+MAX_PAGE_LIMIT = 1000
+DEFAULT_PAGE_LIMIT = MAX_PAGE_LIMIT
 
-# Create the main app without a prefix
-app = FastAPI()
+# Largest batch a bulk create accepts (bigger bodies get a 422); larger menu
+# imports are sent in several requests
+MAX_BULK_ITEMS = 500
+
+# Menu reads (every customer QR page) vastly outnumber menu edits, so serialized
+# category/subcategory/menu item pages are cached; every menu write clears them
+MENU_CACHE_TTL = float(os.environ.get('MENU_CACHE_TTL', 30))
+_menu_cache = TTLCache(maxsize=1024, ttl=MENU_CACHE_TTL)
+
+# Customer ordering page encoded in table QR codes
+FRONTEND_URL = os.environ.get('FRONTEND_URL', 'http://localhost:3000')
+# QR images are cached as immutable, so their URL carries a hash of the encoded
+# address; changing FRONTEND_URL then yields new URLs instead of stale codes
+QR_VERSION = hashlib.sha256(FRONTEND_URL.encode()).hexdigest()[:8]
+
+CORS_ORIGINS = os.environ.get('CORS_ORIGINS', '*').split(',')
+
+# Create the main app without a prefix. Endpoints without a response_model
+# return ORJSONResponse themselves so their plain dicts skip jsonable_encoder.
+app = FastAPI(default_response_class=ORJSONResponse)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -58,6 +87,27 @@ class OrderType(str, Enum):
 
 # ============ MODELS ============
 
+# Default factories are plain module-level functions rather than lambdas
+
+def uuid7_hex() -> str:
+    """Time-ordered UUIDv7 as hex, so new ids land on the right edge of the id index"""
+    unix_ms = time.time_ns() // 1_000_000
+    rand = int.from_bytes(os.urandom(10), 'big')
+    value = (
+        (unix_ms & 0xFFFFFFFFFFFF) << 80
+        | 0x7 << 76
+        | (rand >> 68) << 64
+        | 0b10 << 62
+        | rand & 0x3FFFFFFFFFFFFFFF
+    )
+    return f"{value:032x}"
+
+# Timestamps are stored as-is, so create responses match what later reads return
+def bson_utcnow() -> datetime:
+    """Current UTC time truncated to the millisecond precision of BSON dates"""
+    now = datetime.now(timezone.utc)
+    return now.replace(microsecond=now.microsecond // 1000 * 1000)
+
 # ============ AUTH MODELS ============
 
 class UserRegister(BaseModel):
@@ -74,14 +124,14 @@ class UserLogin(BaseModel):
 
 class User(BaseModel):
     model_config = ConfigDict(extra="ignore")
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=uuid7_hex)
     email: EmailStr
     name: str
     role: str
     restaurant_id: Optional[str] = None
     branch_id: Optional[str] = None
     is_active: bool = True
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    created_at: datetime = Field(default_factory=bson_utcnow)
 
 class TokenResponse(BaseModel):
     access_token: str
@@ -98,14 +148,14 @@ class RestaurantCreate(BaseModel):
 
 class Restaurant(BaseModel):
     model_config = ConfigDict(extra="ignore")
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=uuid7_hex)
     owner_id: str
     name: str
     contact: Optional[str] = None
     email: Optional[str] = None
     address: Optional[str] = None
     is_active: bool = True
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    created_at: datetime = Field(default_factory=bson_utcnow)
 
 class BranchCreate(BaseModel):
     restaurant_id: str
@@ -115,13 +165,13 @@ class BranchCreate(BaseModel):
 
 class Branch(BaseModel):
     model_config = ConfigDict(extra="ignore")
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=uuid7_hex)
     restaurant_id: str
     name: str
     location: Optional[str] = None
     contact: Optional[str] = None
     is_active: bool = True
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    created_at: datetime = Field(default_factory=bson_utcnow)
 
 # Category Models
 class CategoryCreate(BaseModel):
@@ -130,10 +180,10 @@ class CategoryCreate(BaseModel):
 
 class Category(BaseModel):
     model_config = ConfigDict(extra="ignore")
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=uuid7_hex)
     name: str
     status: bool = True
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    created_at: datetime = Field(default_factory=bson_utcnow)
 
 # Subcategory Models
 class SubCategoryCreate(BaseModel):
@@ -143,11 +193,11 @@ class SubCategoryCreate(BaseModel):
 
 class SubCategory(BaseModel):
     model_config = ConfigDict(extra="ignore")
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=uuid7_hex)
     category_id: str
     name: str
     status: bool = True
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    created_at: datetime = Field(default_factory=bson_utcnow)
 
 # Menu Item Models
 class MenuItemModifier(BaseModel):
@@ -172,7 +222,7 @@ class MenuItemCreate(BaseModel):
 
 class MenuItem(BaseModel):
     model_config = ConfigDict(extra="ignore")
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=uuid7_hex)
     category_id: str
     sub_category_id: Optional[str] = None
     name: str
@@ -183,9 +233,13 @@ class MenuItem(BaseModel):
     availability: bool = True
     image_url: Optional[str] = None
     modifiers: Optional[List[MenuItemModifier]] = []
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    created_at: datetime = Field(default_factory=bson_utcnow)
 
 # Table Models
+def table_qr_url(table_id: str) -> str:
+    """Path of a table's QR code image, versioned by FRONTEND_URL"""
+    return f"/api/tables/{table_id}/qr?v={QR_VERSION}"
+
 class TableCreate(BaseModel):
     branch_id: str = "main"
     table_name: str
@@ -193,13 +247,18 @@ class TableCreate(BaseModel):
 
 class Table(BaseModel):
     model_config = ConfigDict(extra="ignore")
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=uuid7_hex)
     branch_id: str = "main"
     table_name: str
     capacity: int
     status: TableStatus = TableStatus.AVAILABLE
-    qr_url: Optional[str] = None
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    created_at: datetime = Field(default_factory=bson_utcnow)
+
+    @computed_field
+    @property
+    def qr_url(self) -> str:
+        """Path of the PNG QR code image, rendered on demand"""
+        return table_qr_url(self.id)
 
 # Order Models
 class OrderItem(BaseModel):
@@ -218,7 +277,7 @@ class OrderCreate(BaseModel):
 
 class Order(BaseModel):
     model_config = ConfigDict(extra="ignore")
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=uuid7_hex)
     table_id: Optional[str] = None
     order_type: OrderType = OrderType.DINE_IN
     items: List[OrderItem]
@@ -230,7 +289,7 @@ class Order(BaseModel):
     grand_total: float = 0.0
     payment_status: PaymentStatus = PaymentStatus.PENDING
     order_status: OrderStatus = OrderStatus.PENDING
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    created_at: datetime = Field(default_factory=bson_utcnow)
 
 class OrderStatusUpdate(BaseModel):
     order_status: OrderStatus
@@ -253,7 +312,7 @@ class DiscountCreate(BaseModel):
 
 class Discount(BaseModel):
     model_config = ConfigDict(extra="ignore")
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=uuid7_hex)
     name: str
     type: DiscountType
     value: float
@@ -261,7 +320,7 @@ class Discount(BaseModel):
     end_date: Optional[datetime] = None
     is_active: bool = True
     applied_on: str = "order"
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    created_at: datetime = Field(default_factory=bson_utcnow)
 
 # ============ RESERVATION MODELS ============
 
@@ -282,7 +341,7 @@ class ReservationCreate(BaseModel):
 
 class Reservation(BaseModel):
     model_config = ConfigDict(extra="ignore")
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=uuid7_hex)
     table_id: str
     customer_name: str
     customer_phone: str
@@ -291,34 +350,88 @@ class Reservation(BaseModel):
     reservation_date: datetime
     status: ReservationStatus = ReservationStatus.PENDING
     notes: Optional[str] = None
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    created_at: datetime = Field(default_factory=bson_utcnow)
 
 # ============ UTILITY FUNCTIONS ============
 
-def generate_qr_code(data: str) -> str:
-    """Generate QR code and return as base64 string"""
-    qr = qrcode.QRCode(version=1, box_size=10, border=4)
-    qr.add_data(data)
-    qr.make(fit=True)
-    img = qr.make_image(fill_color="black", back_color="white")
-    
+CATEGORY_PROJECTION = model_projection(Category)
+SUBCATEGORY_PROJECTION = model_projection(SubCategory)
+MENU_ITEM_PROJECTION = model_projection(MenuItem)
+MENU_ITEM_COMPACT_PROJECTION = {
+    field: include for field, include in MENU_ITEM_PROJECTION.items()
+    if field not in ("description", "image_url")
+}
+TABLE_PROJECTION = model_projection(Table)
+ORDER_PROJECTION = model_projection(Order)
+
+# Documents read back from our own collections were validated on write, so
+# handlers don't validate them again. List handlers return them as
+# ORJSONResponse or pre-serialized JSON, which FastAPI sends without
+# response_model validation (the model still documents the schema).
+# Single-document handlers build their models with model_construct, with nested
+# models and enums constructed explicitly so serialization stays exact.
+
+def menu_item_from_db(doc: dict) -> MenuItem:
+    """Build a MenuItem from a stored document without re-validating it"""
+    fields = dict(doc)
+    if fields.get('pricing') is not None:
+        fields['pricing'] = MenuItemPricing.model_construct(**fields['pricing'])
+    if fields.get('modifiers'):
+        fields['modifiers'] = [MenuItemModifier.model_construct(**m) for m in fields['modifiers']]
+    return MenuItem.model_construct(**fields)
+
+def table_from_db(doc: dict) -> Table:
+    """Build a Table from a stored document without re-validating it"""
+    fields = dict(doc)
+    fields['status'] = TableStatus(fields.get('status', TableStatus.AVAILABLE))
+    return Table.model_construct(**fields)
+
+def order_from_db(doc: dict) -> Order:
+    """Build an Order from a stored document without re-validating it"""
+    fields = dict(doc)
+    fields['items'] = [OrderItem.model_construct(**item) for item in fields.get('items', [])]
+    fields['order_type'] = OrderType(fields.get('order_type', OrderType.DINE_IN))
+    fields['payment_status'] = PaymentStatus(fields.get('payment_status', PaymentStatus.PENDING))
+    fields['order_status'] = OrderStatus(fields.get('order_status', OrderStatus.PENDING))
+    return Order.model_construct(**fields)
+
+async def ensure_categories_exist(category_ids: set) -> None:
+    """Raise 404 unless every category id exists, using a single $in lookup"""
+    found = await db.categories.find(
+        {"id": {"$in": list(category_ids)}}, {"_id": 0, "id": 1}
+    ).to_list(None)
+    missing = category_ids - {cat['id'] for cat in found}
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Category not found: {', '.join(sorted(missing))}")
+
+# Background tasks must be coroutine functions: Starlette runs any other
+# callable in a worker thread, where Motor methods have no event loop
+async def release_table(table_id: str) -> None:
+    """Mark a table available again"""
+    await db.tables.update_one({"id": table_id}, {"$set": {"status": TableStatus.AVAILABLE}})
+
+def invalidate_menu_cache() -> None:
+    """Drop cached menu listings after a category, subcategory or item write"""
+    _menu_cache.clear()
+
+def json_bytes_response(body: bytes) -> Response:
+    """Wrap an already serialized JSON body"""
+    return Response(content=body, media_type="application/json")
+
+@lru_cache(maxsize=1024)
+def generate_qr_code(data: str) -> bytes:
+    """Generate QR code and return the PNG bytes"""
     buffer = io.BytesIO()
-    img.save(buffer, format='PNG')
-    img_str = base64.b64encode(buffer.getvalue()).decode()
-    return f"data:image/png;base64,{img_str}"
+    segno.make(data, error='m').save(buffer, kind='png', scale=10, border=4)
+    return buffer.getvalue()
 
 # ============ AUTHENTICATION ROUTES ============
 
 @api_router.post("/auth/register", response_model=User)
 async def register(user_data: UserRegister):
     """Register a new user"""
-    # Check if user already exists
-    existing_user = await db.users.find_one({"email": user_data.email})
-    if existing_user:
-        raise HTTPException(status_code=400, detail="Email already registered")
-    
     # Hash password
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash_async(user_data.password)
     
     # Create user
     user_obj = User(
@@ -331,9 +444,12 @@ async def register(user_data: UserRegister):
     
     doc = user_obj.model_dump()
     doc['password'] = hashed_password
-    doc['created_at'] = doc['created_at'].isoformat()
     
-    await db.users.insert_one(doc)
+    # The unique email index rejects duplicates atomically, no lookup needed
+    try:
+        await db.users.insert_one(doc)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Email already registered")
     return user_obj
 
 @api_router.post("/auth/login", response_model=TokenResponse)
@@ -344,44 +460,46 @@ async def login(credentials: UserLogin):
     if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
-    # Verify password
-    if not verify_password(credentials.password, user['password']):
+    # Verify password, upgrading the stored hash if its cost setting changed
+    valid, new_hash = await verify_and_update_password_async(credentials.password, user['password'])
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    if new_hash:
+        await db.users.update_one({"id": user['id']}, {"$set": {"password": new_hash}})
     
     # Check if user is active
     if not user.get('is_active', True):
         raise HTTPException(status_code=401, detail="Account is deactivated")
     
+    # Remove password from response
+    user.pop('password', None)
+    
     # Create access token
     access_token = create_access_token(data={"sub": user['id'], "role": user['role']})
     
-    # Parse user object
-    if isinstance(user['created_at'], str):
-        user['created_at'] = datetime.fromisoformat(user['created_at'])
-    
-    # Remove password from response
-    user.pop('password', None)
+    # Warm the user cache so the client's first authenticated call skips Mongo
+    cache_user(user)
     
     return TokenResponse(access_token=access_token, user=user)
 
 @api_router.post("/auth/logout")
-async def logout():
-    """Logout user (client should delete token)"""
+async def logout(credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)):
+    """Logout user and revoke the presented token (client should delete it too)"""
+    if credentials:
+        await revoke_token(credentials.credentials)
     return {"message": "Logged out successfully"}
 
 @api_router.get("/auth/me", response_model=User)
-async def get_me(current_user: dict = Depends(get_current_user_dependency)):
+async def get_me(current_user: CurrentUser):
     """Get current user info"""
-    if isinstance(current_user['created_at'], str):
-        current_user['created_at'] = datetime.fromisoformat(current_user['created_at'])
-    return User(**current_user)
+    return User.model_construct(**current_user)
 
 # ============ RESTAURANT ROUTES ============
 
 @api_router.post("/restaurants", response_model=Restaurant)
 async def create_restaurant(
     restaurant: RestaurantCreate,
-    current_user: dict = Depends(get_current_user_dependency)
+    current_user: CurrentUser
 ):
     """Create a new restaurant"""
     restaurant_obj = Restaurant(
@@ -390,24 +508,22 @@ async def create_restaurant(
     )
     
     doc = restaurant_obj.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
     
     await db.restaurants.insert_one(doc)
     return restaurant_obj
 
 @api_router.get("/restaurants", response_model=List[Restaurant])
 async def get_restaurants(
-    current_user: dict = Depends(get_current_user_dependency)
+    current_user: CurrentUser,
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    offset: int = Query(0, ge=0)
 ):
     """Get all restaurants for current user"""
     query = {}
     if current_user['role'] != UserRole.SUPER_ADMIN:
         query['owner_id'] = current_user['id']
     
-    restaurants = await db.restaurants.find(query, {"_id": 0}).to_list(1000)
-    for rest in restaurants:
-        if isinstance(rest['created_at'], str):
-            rest['created_at'] = datetime.fromisoformat(rest['created_at'])
+    restaurants = await db.restaurants.find(query, {"_id": 0}).sort("_id", 1).skip(offset).limit(limit).to_list(limit)
     return restaurants
 
 # ============ BRANCH ROUTES ============
@@ -415,28 +531,32 @@ async def get_restaurants(
 @api_router.post("/branches", response_model=Branch)
 async def create_branch(
     branch: BranchCreate,
-    current_user: dict = Depends(get_current_user_dependency)
+    current_user: CurrentUser
 ):
     """Create a new branch"""
-    # Verify restaurant exists and user has access
-    restaurant = await db.restaurants.find_one({"id": branch.restaurant_id})
-    if not restaurant:
+    # Verify restaurant exists and user has access in one query by folding
+    # ownership into the filter for non-admins
+    query = {"id": branch.restaurant_id}
+    if current_user['role'] not in [UserRole.SUPER_ADMIN, UserRole.BRANCH_ADMIN]:
+        query['owner_id'] = current_user['id']
+    if not await db.restaurants.count_documents(query, limit=1):
+        # Only the failure path pays to tell "missing" from "not yours"
+        if 'owner_id' in query and await db.restaurants.count_documents({"id": branch.restaurant_id}, limit=1):
+            raise HTTPException(status_code=403, detail="Insufficient permissions")
         raise HTTPException(status_code=404, detail="Restaurant not found")
     
-    if current_user['role'] not in [UserRole.SUPER_ADMIN, UserRole.BRANCH_ADMIN] and restaurant['owner_id'] != current_user['id']:
-        raise HTTPException(status_code=403, detail="Insufficient permissions")
-    
     branch_obj = Branch(**branch.model_dump())
     doc = branch_obj.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
     
     await db.branches.insert_one(doc)
     return branch_obj
 
 @api_router.get("/branches", response_model=List[Branch])
 async def get_branches(
+    current_user: CurrentUser,
     restaurant_id: Optional[str] = None,
-    current_user: dict = Depends(get_current_user_dependency)
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    offset: int = Query(0, ge=0)
 ):
     """Get all branches"""
     query = {}
@@ -445,25 +565,20 @@ async def get_branches(
     elif current_user.get('restaurant_id'):
         query['restaurant_id'] = current_user['restaurant_id']
     
-    branches = await db.branches.find(query, {"_id": 0}).to_list(1000)
-    for branch in branches:
-        if isinstance(branch['created_at'], str):
-            branch['created_at'] = datetime.fromisoformat(branch['created_at'])
+    branches = await db.branches.find(query, {"_id": 0}).sort("_id", 1).skip(offset).limit(limit).to_list(limit)
     return branches
 
 @api_router.get("/branches/{branch_id}", response_model=Branch)
 async def get_branch(
     branch_id: str,
-    current_user: dict = Depends(get_current_user_dependency)
+    current_user: CurrentUser
 ):
     """Get branch by ID"""
     branch = await db.branches.find_one({"id": branch_id}, {"_id": 0})
     if not branch:
         raise HTTPException(status_code=404, detail="Branch not found")
     
-    if isinstance(branch['created_at'], str):
-        branch['created_at'] = datetime.fromisoformat(branch['created_at'])
-    return Branch(**branch)
+    return Branch.model_construct(**branch)
 
 # ============ CATEGORY ROUTES ============
 
@@ -471,37 +586,42 @@ async def get_branch(
 async def create_category(category: CategoryCreate):
     category_obj = Category(**category.model_dump())
     doc = category_obj.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
     await db.categories.insert_one(doc)
+    invalidate_menu_cache()
     return category_obj
 
 @api_router.get("/categories", response_model=List[Category])
-async def get_categories():
-    categories = await db.categories.find({}, {"_id": 0}).to_list(1000)
-    for cat in categories:
-        if isinstance(cat['created_at'], str):
-            cat['created_at'] = datetime.fromisoformat(cat['created_at'])
-    return categories
+async def get_categories(
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    offset: int = Query(0, ge=0)
+):
+    key = ("categories", limit, offset)
+    body = _menu_cache.get(key)
+    if body is None:
+        categories = await db.categories.find({}, CATEGORY_PROJECTION).sort("_id", 1).skip(offset).limit(limit).to_list(limit)
+        body = json_dumps(categories)
+        _menu_cache.set(key, body)
+    return json_bytes_response(body)
 
 @api_router.put("/categories/{category_id}", response_model=Category)
 async def update_category(category_id: str, category: CategoryCreate):
-    result = await db.categories.find_one({"id": category_id}, {"_id": 0})
-    if not result:
+    updated = await db.categories.find_one_and_update(
+        {"id": category_id},
+        {"$set": category.model_dump()},
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER
+    )
+    if updated is None:
         raise HTTPException(status_code=404, detail="Category not found")
-    
-    update_data = category.model_dump()
-    await db.categories.update_one({"id": category_id}, {"$set": update_data})
-    
-    updated = await db.categories.find_one({"id": category_id}, {"_id": 0})
-    if isinstance(updated['created_at'], str):
-        updated['created_at'] = datetime.fromisoformat(updated['created_at'])
-    return Category(**updated)
+    invalidate_menu_cache()
+    return Category.model_construct(**updated)
 
 @api_router.delete("/categories/{category_id}")
 async def delete_category(category_id: str):
     result = await db.categories.delete_one({"id": category_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Category not found")
+    invalidate_menu_cache()
     return {"message": "Category deleted successfully"}
 
 # ============ SUBCATEGORY ROUTES ============
@@ -509,44 +629,61 @@ async def delete_category(category_id: str):
 @api_router.post("/subcategories", response_model=SubCategory)
 async def create_subcategory(subcategory: SubCategoryCreate):
     # Check if category exists
-    category = await db.categories.find_one({"id": subcategory.category_id})
-    if not category:
+    if not await db.categories.count_documents({"id": subcategory.category_id}, limit=1):
         raise HTTPException(status_code=404, detail="Category not found")
     
     subcategory_obj = SubCategory(**subcategory.model_dump())
     doc = subcategory_obj.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
     await db.subcategories.insert_one(doc)
+    invalidate_menu_cache()
     return subcategory_obj
 
+@api_router.post("/subcategories/bulk", response_model=List[SubCategory])
+async def create_subcategories_bulk(subcategories: conlist(SubCategoryCreate, max_length=MAX_BULK_ITEMS)):
+    """Create many subcategories with one category check and one insert"""
+    if not subcategories:
+        return []
+    await ensure_categories_exist({sub.category_id for sub in subcategories})
+    
+    subcategory_objs = [SubCategory(**sub.model_dump()) for sub in subcategories]
+    await db.subcategories.insert_many([obj.model_dump() for obj in subcategory_objs])
+    invalidate_menu_cache()
+    return subcategory_objs
+
 @api_router.get("/subcategories", response_model=List[SubCategory])
-async def get_subcategories(category_id: Optional[str] = None):
-    query = {"category_id": category_id} if category_id else {}
-    subcategories = await db.subcategories.find(query, {"_id": 0}).to_list(1000)
-    for subcat in subcategories:
-        if isinstance(subcat['created_at'], str):
-            subcat['created_at'] = datetime.fromisoformat(subcat['created_at'])
-    return subcategories
+async def get_subcategories(
+    category_id: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    offset: int = Query(0, ge=0)
+):
+    key = ("subcategories", category_id, limit, offset)
+    body = _menu_cache.get(key)
+    if body is None:
+        query = {"category_id": category_id} if category_id else {}
+        subcategories = await db.subcategories.find(query, SUBCATEGORY_PROJECTION).sort("_id", 1).skip(offset).limit(limit).to_list(limit)
+        body = json_dumps(subcategories)
+        _menu_cache.set(key, body)
+    return json_bytes_response(body)
 
 @api_router.put("/subcategories/{subcategory_id}", response_model=SubCategory)
 async def update_subcategory(subcategory_id: str, subcategory: SubCategoryCreate):
-    result = await db.subcategories.find_one({"id": subcategory_id}, {"_id": 0})
-    if not result:
+    updated = await db.subcategories.find_one_and_update(
+        {"id": subcategory_id},
+        {"$set": subcategory.model_dump()},
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER
+    )
+    if updated is None:
         raise HTTPException(status_code=404, detail="Subcategory not found")
-    
-    update_data = subcategory.model_dump()
-    await db.subcategories.update_one({"id": subcategory_id}, {"$set": update_data})
-    
-    updated = await db.subcategories.find_one({"id": subcategory_id}, {"_id": 0})
-    if isinstance(updated['created_at'], str):
-        updated['created_at'] = datetime.fromisoformat(updated['created_at'])
-    return SubCategory(**updated)
+    invalidate_menu_cache()
+    return SubCategory.model_construct(**updated)
 
 @api_router.delete("/subcategories/{subcategory_id}")
 async def delete_subcategory(subcategory_id: str):
     result = await db.subcategories.delete_one({"id": subcategory_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Subcategory not found")
+    invalidate_menu_cache()
     return {"message": "Subcategory deleted successfully"}
 
 # ============ MENU ITEM ROUTES ============
@@ -554,29 +691,50 @@ async def delete_subcategory(subcategory_id: str):
 @api_router.post("/menu/item", response_model=MenuItem)
 async def create_menu_item(item: MenuItemCreate):
     # Verify category exists
-    category = await db.categories.find_one({"id": item.category_id})
-    if not category:
+    if not await db.categories.count_documents({"id": item.category_id}, limit=1):
         raise HTTPException(status_code=404, detail="Category not found")
     
     menu_item_obj = MenuItem(**item.model_dump())
     doc = menu_item_obj.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
     await db.menu_items.insert_one(doc)
+    invalidate_menu_cache()
     return menu_item_obj
 
+@api_router.post("/menu/items/bulk", response_model=List[MenuItem])
+async def create_menu_items_bulk(items: conlist(MenuItemCreate, max_length=MAX_BULK_ITEMS)):
+    """Create many menu items (e.g. a menu import) with one category check and one insert"""
+    if not items:
+        return []
+    await ensure_categories_exist({item.category_id for item in items})
+    
+    menu_item_objs = [MenuItem(**item.model_dump()) for item in items]
+    await db.menu_items.insert_many([obj.model_dump() for obj in menu_item_objs])
+    invalidate_menu_cache()
+    return menu_item_objs
+
 @api_router.get("/menu/items", response_model=List[MenuItem])
-async def get_menu_items(category_id: Optional[str] = None, available_only: bool = False):
+async def get_menu_items(
+    category_id: Optional[str] = None,
+    available_only: bool = False,
+    compact: bool = False,
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    offset: int = Query(0, ge=0)
+):
+    key = ("menu_items", category_id, available_only, compact, limit, offset)
+    body = _menu_cache.get(key)
+    if body is not None:
+        return json_bytes_response(body)
+    
     query = {}
     if category_id:
         query["category_id"] = category_id
     if available_only:
         query["availability"] = True
     
-    items = await db.menu_items.find(query, {"_id": 0}).to_list(1000)
+    # compact listings skip the free-text fields the POS grid doesn't need
+    projection = MENU_ITEM_COMPACT_PROJECTION if compact else MENU_ITEM_PROJECTION
+    items = await db.menu_items.find(query, projection).sort("_id", 1).skip(offset).limit(limit).to_list(limit)
     for item in items:
-        if isinstance(item['created_at'], str):
-            item['created_at'] = datetime.fromisoformat(item['created_at'])
-        
         # Migrate old format to new format on the fly
         if 'price' in item and 'pricing' not in item:
             item['pricing'] = {
@@ -589,27 +747,29 @@ async def get_menu_items(category_id: Optional[str] = None, available_only: bool
         if 'modifiers' not in item:
             item['modifiers'] = []
     
-    return items
+    body = json_dumps(items)
+    _menu_cache.set(key, body)
+    return json_bytes_response(body)
 
 @api_router.put("/menu/item/{item_id}", response_model=MenuItem)
 async def update_menu_item(item_id: str, item: MenuItemCreate):
-    result = await db.menu_items.find_one({"id": item_id}, {"_id": 0})
-    if not result:
+    updated = await db.menu_items.find_one_and_update(
+        {"id": item_id},
+        {"$set": item.model_dump()},
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER
+    )
+    if updated is None:
         raise HTTPException(status_code=404, detail="Menu item not found")
-    
-    update_data = item.model_dump()
-    await db.menu_items.update_one({"id": item_id}, {"$set": update_data})
-    
-    updated = await db.menu_items.find_one({"id": item_id}, {"_id": 0})
-    if isinstance(updated['created_at'], str):
-        updated['created_at'] = datetime.fromisoformat(updated['created_at'])
-    return MenuItem(**updated)
+    invalidate_menu_cache()
+    return menu_item_from_db(updated)
 
 @api_router.delete("/menu/item/{item_id}")
 async def delete_menu_item(item_id: str):
     result = await db.menu_items.delete_one({"id": item_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Menu item not found")
+    invalidate_menu_cache()
     return {"message": "Menu item deleted successfully"}
 
 # ============ TABLE ROUTES ============
@@ -617,47 +777,38 @@ async def delete_menu_item(item_id: str):
 @api_router.post("/tables", response_model=Table)
 async def create_table(table: TableCreate):
     table_obj = Table(**table.model_dump())
-    
-    # Generate QR code for table ordering page
-    frontend_url = os.environ.get('FRONTEND_URL', 'http://localhost:3000')
-    qr_data = f"{frontend_url}/order/{table_obj.id}"
-    table_obj.qr_url = generate_qr_code(qr_data)
-    
-    doc = table_obj.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
+    doc = table_obj.model_dump(exclude={'qr_url'})
     await db.tables.insert_one(doc)
     return table_obj
 
 @api_router.get("/tables", response_model=List[Table])
-async def get_tables():
-    tables = await db.tables.find({}, {"_id": 0}).to_list(1000)
+async def get_tables(
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    offset: int = Query(0, ge=0)
+):
+    tables = await db.tables.find({}, TABLE_PROJECTION).sort("_id", 1).skip(offset).limit(limit).to_list(limit)
     for table in tables:
-        if isinstance(table['created_at'], str):
-            table['created_at'] = datetime.fromisoformat(table['created_at'])
-    return tables
+        table["qr_url"] = table_qr_url(table["id"])
+    return ORJSONResponse(tables)
 
 @api_router.get("/tables/{table_id}", response_model=Table)
 async def get_table(table_id: str):
-    table = await db.tables.find_one({"id": table_id}, {"_id": 0})
+    table = await db.tables.find_one({"id": table_id}, TABLE_PROJECTION)
     if not table:
         raise HTTPException(status_code=404, detail="Table not found")
-    if isinstance(table['created_at'], str):
-        table['created_at'] = datetime.fromisoformat(table['created_at'])
-    return Table(**table)
+    return table_from_db(table)
 
 @api_router.put("/tables/{table_id}", response_model=Table)
 async def update_table(table_id: str, table: TableCreate):
-    result = await db.tables.find_one({"id": table_id}, {"_id": 0})
-    if not result:
+    updated = await db.tables.find_one_and_update(
+        {"id": table_id},
+        {"$set": table.model_dump()},
+        projection=TABLE_PROJECTION,
+        return_document=ReturnDocument.AFTER
+    )
+    if updated is None:
         raise HTTPException(status_code=404, detail="Table not found")
-    
-    update_data = table.model_dump()
-    await db.tables.update_one({"id": table_id}, {"$set": update_data})
-    
-    updated = await db.tables.find_one({"id": table_id}, {"_id": 0})
-    if isinstance(updated['created_at'], str):
-        updated['created_at'] = datetime.fromisoformat(updated['created_at'])
-    return Table(**updated)
+    return table_from_db(updated)
 
 @api_router.delete("/tables/{table_id}")
 async def delete_table(table_id: str):
@@ -668,85 +819,99 @@ async def delete_table(table_id: str):
 
 @api_router.get("/tables/{table_id}/qr")
 async def get_table_qr(table_id: str):
-    table = await db.tables.find_one({"id": table_id}, {"_id": 0})
-    if not table:
+    if not await db.tables.count_documents({"id": table_id}, limit=1):
         raise HTTPException(status_code=404, detail="Table not found")
-    return {"qr_url": table.get('qr_url')}
+    # Rendering is CPU bound, keep it off the event loop
+    png = await asyncio.to_thread(generate_qr_code, f"{FRONTEND_URL}/order/{table_id}")
+    return Response(
+        content=png,
+        media_type="image/png",
+        # PNG is already compressed; identity keeps GZipMiddleware off it
+        headers={"Cache-Control": "public, max-age=31536000, immutable", "Content-Encoding": "identity"}
+    )
 
 # ============ ORDER ROUTES ============
 
 @api_router.post("/orders", response_model=Order)
 async def create_order(order: OrderCreate):
-    # Calculate totals
-    total_amount = sum(item.price * item.quantity for item in order.items)
-    tax = sum(item.tax * item.quantity for item in order.items)
+    # Calculate totals in a single pass over the items
+    total_amount = tax = 0.0
+    for item in order.items:
+        total_amount += item.price * item.quantity
+        tax += item.tax * item.quantity
     
-    order_obj = Order(**order.model_dump())
-    order_obj.total_amount = total_amount
-    order_obj.tax = tax
-    order_obj.grand_total = total_amount + tax - order_obj.discount
+    # Reuse the already validated OrderItem instances instead of dumping
+    # the request and validating it again
+    order_obj = Order(
+        **dict(order),
+        total_amount=total_amount,
+        tax=tax,
+        grand_total=total_amount + tax
+    )
     
+    # Single dump straight to BSON-ready types (created_at stays a datetime)
     doc = order_obj.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
-    # Convert nested items
-    doc['items'] = [item.model_dump() for item in order_obj.items]
     
-    await db.orders.insert_one(doc)
+    # The order insert and the table update are independent, so overlap them
+    writes = [db.orders.insert_one(doc)]
     
     # Update table status if it's a dine-in order
     if order_obj.table_id and order_obj.order_type == OrderType.DINE_IN:
-        await db.tables.update_one(
+        writes.append(db.tables.update_one(
             {"id": order_obj.table_id},
             {"$set": {"status": TableStatus.OCCUPIED}}
-        )
+        ))
     
+    await asyncio.gather(*writes)
     return order_obj
 
 @api_router.get("/orders", response_model=List[Order])
-async def get_orders(status: Optional[OrderStatus] = None, table_id: Optional[str] = None):
+async def get_orders(
+    status: Optional[OrderStatus] = None,
+    table_id: Optional[str] = None,
+    since: Optional[datetime] = None,
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    offset: int = Query(0, ge=0)
+):
     query = {}
     if status:
         query["order_status"] = status
     if table_id:
         query["table_id"] = table_id
+    if since:
+        # Lets clients poll for orders created after their last fetch
+        query["created_at"] = {"$gt": since}
     
-    orders = await db.orders.find(query, {"_id": 0}).sort("created_at", -1).to_list(1000)
-    for order in orders:
-        if isinstance(order['created_at'], str):
-            order['created_at'] = datetime.fromisoformat(order['created_at'])
-    return orders
+    orders = await db.orders.find(query, ORDER_PROJECTION).sort([("created_at", -1), ("_id", -1)]).skip(offset).limit(limit).to_list(limit)
+    return ORJSONResponse(orders)
 
 @api_router.get("/orders/{order_id}", response_model=Order)
 async def get_order(order_id: str):
     order = await db.orders.find_one({"id": order_id}, {"_id": 0})
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
-    if isinstance(order['created_at'], str):
-        order['created_at'] = datetime.fromisoformat(order['created_at'])
-    return Order(**order)
+    return order_from_db(order)
 
 @api_router.patch("/orders/{order_id}/status", response_model=Order)
-async def update_order_status(order_id: str, status_update: OrderStatusUpdate):
-    order = await db.orders.find_one({"id": order_id}, {"_id": 0})
-    if not order:
-        raise HTTPException(status_code=404, detail="Order not found")
-    
-    await db.orders.update_one(
+async def update_order_status(
+    order_id: str,
+    status_update: OrderStatusUpdate,
+    background_tasks: BackgroundTasks
+):
+    updated = await db.orders.find_one_and_update(
         {"id": order_id},
-        {"$set": {"order_status": status_update.order_status}}
+        {"$set": {"order_status": status_update.order_status}},
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER
     )
+    if updated is None:
+        raise HTTPException(status_code=404, detail="Order not found")
     
-    # If order is completed, free up the table
-    if status_update.order_status == OrderStatus.COMPLETED and order.get('table_id'):
-        await db.tables.update_one(
-            {"id": order['table_id']},
-            {"$set": {"status": TableStatus.AVAILABLE}}
-        )
+    # If order is completed, free up the table once the response has been sent
+    if status_update.order_status == OrderStatus.COMPLETED and updated.get('table_id'):
+        background_tasks.add_task(release_table, updated['table_id'])
     
-    updated = await db.orders.find_one({"id": order_id}, {"_id": 0})
-    if isinstance(updated['created_at'], str):
-        updated['created_at'] = datetime.fromisoformat(updated['created_at'])
-    return Order(**updated)
+    return order_from_db(updated)
 
 # ============ DASHBOARD STATS ============
 
@@ -754,30 +919,36 @@ async def update_order_status(order_id: str, status_update: OrderStatusUpdate):
 async def get_dashboard_stats():
     # Get today's date range
     today_start = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
-    today_start_iso = today_start.isoformat()
-    
-    # Count tables
-    total_tables = await db.tables.count_documents({})
-    occupied_tables = await db.tables.count_documents({"status": TableStatus.OCCUPIED})
-    
-    # Count orders
-    total_orders = await db.orders.count_documents({})
-    today_orders = await db.orders.count_documents({
-        "created_at": {"$gte": today_start_iso}
-    })
     
-    # Calculate revenue
-    all_orders = await db.orders.find({}, {"_id": 0, "grand_total": 1, "created_at": 1}).to_list(10000)
-    total_revenue = sum(order.get('grand_total', 0) for order in all_orders)
-    today_revenue = sum(
-        order.get('grand_total', 0) for order in all_orders
-        if order.get('created_at', '') >= today_start_iso
+    # Tables per status, order totals and menu count run concurrently
+    order_totals = {"_id": None, "revenue": {"$sum": "$grand_total"}, "count": {"$sum": 1}}
+    table_counts, facets, total_menu_items = await asyncio.gather(
+        db.tables.aggregate([
+            {"$group": {"_id": "$status", "count": {"$sum": 1}}}
+        ]).to_list(None),
+        db.orders.aggregate([
+            {"$facet": {
+                "all": [{"$group": order_totals}],
+                "today": [
+                    {"$match": {"created_at": {"$gte": today_start}}},
+                    {"$group": order_totals}
+                ]
+            }}
+        ]).to_list(None),
+        db.menu_items.count_documents({})
     )
+    tables_by_status = {row["_id"]: row["count"] for row in table_counts}
+    total_tables = sum(tables_by_status.values())
+    occupied_tables = tables_by_status.get(TableStatus.OCCUPIED, 0)
     
-    # Count menu items
-    total_menu_items = await db.menu_items.count_documents({})
+    all_stats = facets[0]["all"][0] if facets[0]["all"] else {}
+    today_stats = facets[0]["today"][0] if facets[0]["today"] else {}
+    total_orders = all_stats.get("count", 0)
+    today_orders = today_stats.get("count", 0)
+    total_revenue = all_stats.get("revenue", 0)
+    today_revenue = today_stats.get("revenue", 0)
     
-    return {
+    return ORJSONResponse({
         "total_tables": total_tables,
         "occupied_tables": occupied_tables,
         "available_tables": total_tables - occupied_tables,
@@ -786,7 +957,7 @@ async def get_dashboard_stats():
         "total_revenue": round(total_revenue, 2),
         "today_revenue": round(today_revenue, 2),
         "total_menu_items": total_menu_items
-    }
+    })
 
 # ============ DISCOUNT & PROMOTION ROUTES ============
 
@@ -795,26 +966,17 @@ async def create_discount(discount: DiscountCreate):
     """Create a new discount"""
     discount_obj = Discount(**discount.model_dump())
     doc = discount_obj.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
-    if doc.get('start_date'):
-        doc['start_date'] = doc['start_date'].isoformat()
-    if doc.get('end_date'):
-        doc['end_date'] = doc['end_date'].isoformat()
     
     await db.discounts.insert_one(doc)
     return discount_obj
 
 @api_router.get("/discounts", response_model=List[Discount])
-async def get_discounts():
+async def get_discounts(
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    offset: int = Query(0, ge=0)
+):
     """Get all discounts"""
-    discounts = await db.discounts.find({}, {"_id": 0}).to_list(1000)
-    for discount in discounts:
-        if isinstance(discount['created_at'], str):
-            discount['created_at'] = datetime.fromisoformat(discount['created_at'])
-        if discount.get('start_date') and isinstance(discount['start_date'], str):
-            discount['start_date'] = datetime.fromisoformat(discount['start_date'])
-        if discount.get('end_date') and isinstance(discount['end_date'], str):
-            discount['end_date'] = datetime.fromisoformat(discount['end_date'])
+    discounts = await db.discounts.find({}, {"_id": 0}).sort("_id", 1).skip(offset).limit(limit).to_list(limit)
     return discounts
 
 @api_router.delete("/discounts/{discount_id}")
@@ -831,31 +993,27 @@ async def delete_discount(discount_id: str):
 async def create_reservation(reservation: ReservationCreate):
     """Create a new reservation"""
     # Check if table exists
-    table = await db.tables.find_one({"id": reservation.table_id})
-    if not table:
+    if not await db.tables.count_documents({"id": reservation.table_id}, limit=1):
         raise HTTPException(status_code=404, detail="Table not found")
     
     reservation_obj = Reservation(**reservation.model_dump())
     doc = reservation_obj.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
-    doc['reservation_date'] = doc['reservation_date'].isoformat()
     
     await db.reservations.insert_one(doc)
     return reservation_obj
 
 @api_router.get("/reservations", response_model=List[Reservation])
-async def get_reservations(status: Optional[ReservationStatus] = None):
+async def get_reservations(
+    status: Optional[ReservationStatus] = None,
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    offset: int = Query(0, ge=0)
+):
     """Get all reservations"""
     query = {}
     if status:
         query['status'] = status
     
-    reservations = await db.reservations.find(query, {"_id": 0}).sort("reservation_date", -1).to_list(1000)
-    for reservation in reservations:
-        if isinstance(reservation['created_at'], str):
-            reservation['created_at'] = datetime.fromisoformat(reservation['created_at'])
-        if isinstance(reservation['reservation_date'], str):
-            reservation['reservation_date'] = datetime.fromisoformat(reservation['reservation_date'])
+    reservations = await db.reservations.find(query, {"_id": 0}).sort([("reservation_date", -1), ("_id", 1)]).skip(offset).limit(limit).to_list(limit)
     return reservations
 
 @api_router.patch("/reservations/{reservation_id}/status")
@@ -879,33 +1037,32 @@ async def delete_reservation(reservation_id: str):
 
 # ============ STAFF/USER MANAGEMENT ROUTES ============
 
+# Shared guard instance so FastAPI caches it like any other dependency
+require_admin = require_role([UserRole.SUPER_ADMIN, UserRole.BRANCH_ADMIN])
+
 @api_router.get("/users", response_model=List[User])
-async def get_users(current_user: dict = Depends(get_current_user_dependency)):
+async def get_users(
+    limit: int = Query(DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    offset: int = Query(0, ge=0),
+    current_user: dict = Depends(require_admin)
+):
     """Get all users (Admin only)"""
-    if current_user['role'] not in [UserRole.SUPER_ADMIN, UserRole.BRANCH_ADMIN]:
-        raise HTTPException(status_code=403, detail="Insufficient permissions")
-    
-    users = await db.users.find({}, {"_id": 0, "password": 0}).to_list(1000)
-    for user in users:
-        if isinstance(user['created_at'], str):
-            user['created_at'] = datetime.fromisoformat(user['created_at'])
+    users = await db.users.find({}, {"_id": 0, "password": 0}).sort("_id", 1).skip(offset).limit(limit).to_list(limit)
     return users
 
 @api_router.delete("/users/{user_id}")
-async def delete_user(user_id: str, current_user: dict = Depends(get_current_user_dependency)):
+async def delete_user(user_id: str, current_user: dict = Depends(require_admin)):
     """Delete a user (Admin only)"""
-    if current_user['role'] not in [UserRole.SUPER_ADMIN, UserRole.BRANCH_ADMIN]:
-        raise HTTPException(status_code=403, detail="Insufficient permissions")
-    
     result = await db.users.delete_one({"id": user_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="User not found")
+    invalidate_cached_user(user_id)
     return {"message": "User deleted successfully"}
 
 # ============ REPORTS ROUTES ============
 
 @api_router.get("/reports/sales")
-async def get_sales_report(from_date: Optional[str] = None, to_date: Optional[str] = None):
+async def get_sales_report(from_date: Optional[datetime] = None, to_date: Optional[datetime] = None):
     """Get sales report by date range"""
     query = {}
     if from_date:
@@ -925,19 +1082,19 @@ async def get_sales_report(from_date: Optional[str] = None, to_date: Optional[st
     # Group by date
     sales_by_date = {}
     for order in orders:
-        date_str = order.get('created_at', '')[:10]  # Get date part
+        date_str = order['created_at'].date().isoformat() if order.get('created_at') else ''
         if date_str not in sales_by_date:
             sales_by_date[date_str] = {"orders": 0, "revenue": 0}
         sales_by_date[date_str]["orders"] += 1
         sales_by_date[date_str]["revenue"] += order.get('grand_total', 0)
     
-    return {
+    return ORJSONResponse({
         "total_sales": round(total_sales, 2),
         "total_orders": total_orders,
         "avg_order_value": round(avg_order_value, 2),
         "sales_by_date": sales_by_date,
         "orders": orders
-    }
+    })
 
 @api_router.get("/reports/items")
 async def get_items_report():
@@ -966,10 +1123,10 @@ async def get_items_report():
     items_list = [{"item_id": k, **v} for k, v in item_sales.items()]
     items_list.sort(key=lambda x: x['revenue'], reverse=True)
     
-    return {
+    return ORJSONResponse({
         "items": items_list,
         "total_items": len(items_list)
-    }
+    })
 
 # Include the router in the main app
 app.include_router(api_router)
@@ -977,11 +1134,18 @@ app.include_router(api_router)
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
-    allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
+    allow_origins=CORS_ORIGINS,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
+# Menu and order listings are large, repetitive JSON; compress anything over 1 KB
+app.add_middleware(GZipMiddleware, minimum_size=1000)
+
+# New middleware goes in middleware.py as a pure ASGI class, never
+# @app.middleware("http") / BaseHTTPMiddleware
+app.add_middleware(RequestIdMiddleware)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -989,6 +1153,35 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def create_indexes():
+    try:
+        await ensure_indexes(db)
+    except Exception:
+        logger.exception("Failed to create MongoDB indexes")
+
+@app.on_event("startup")
+async def warm_password_hashing():
+    # Load the bcrypt backend now rather than on the first login after a deploy
+    await get_password_hash_async("warmup")
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+    get_client().close()
+
+
+if __name__ == "__main__":
+    import uvicorn
+    
+    # Each worker is its own process with its own MongoDB connection pool and
+    # its own caches, which other workers' writes don't clear (see cache.py),
+    # so running more than one is opt-in via WEB_CONCURRENCY
+    uvicorn.run(
+        "server:app",
+        host=os.environ.get("HOST", "0.0.0.0"),
+        port=int(os.environ.get("PORT", 8001)),
+        workers=int(os.environ.get("WEB_CONCURRENCY", 1)),
+        loop="uvloop",
+        http="httptools",
+        access_log=False,
+    )
@@ -1,262 +1,79 @@
-from fastapi import FastAPI, APIRouter, HTTPException, status, Depends
-from dotenv import load_dotenv
+from fastapi import FastAPI, APIRouter, HTTPException, Response, Depends
+from fastapi.security import HTTPAuthorizationCredentials
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from starlette.middleware.gzip import GZipMiddleware
 import os
 import logging
-from pathlib import Path
-from pydantic import BaseModel, Field, ConfigDict, EmailStr
 from typing import List, Optional
-import uuid
-from datetime import datetime, timezone
-import qrcode
-import io
-import base64
-from enum import Enum
+from pydantic import TypeAdapter
+from pymongo.errors import DuplicateKeyError
 from auth import (
-    verify_password, get_password_hash, create_access_token,
-    get_current_user, require_role, UserRole
+    verify_and_update_password_async, get_password_hash_async, create_access_token,
+    CurrentUser, cache_user, revoke_token, optional_security
 )
-from dependencies import get_database
+from cache import TTLCache
+from responses import ORJSONResponse, json_dumps
+from dependencies import get_client, get_database, ensure_indexes, model_projection
+from pos_models import (
+    UserRegister, UserLogin, User, TokenResponse, RestaurantCreate, Restaurant,
+    BranchCreate, Branch, CategoryCreate, Category, UserRole
+)
+
+# MongoDB connection (the pooled client shared with the auth dependencies)
+db = get_database()
 
-ROOT_DIR = Path(__file__).parent
-load_dotenv(ROOT_DIR / '.env')
+# Documents read back from Mongo were validated on write, so reads build
+# models with model_construct. Set ENABLE_VALIDATION=1 (e.g. in development)
+# to run full validation on every read instead.
+ENABLE_VALIDATION = os.environ.get('ENABLE_VALIDATION', '').lower() in ('1', 'true', 'yes')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# Category and branch lists are read on every page load but rarely change, so
+# their serialized bodies are cached; creates drop the affected entries
+LIST_CACHE_TTL = float(os.environ.get('LIST_CACHE_TTL', 30))
+_list_cache = TTLCache(maxsize=1024, ttl=LIST_CACHE_TTL)
 
-# Create the main app without a prefix
-app = FastAPI(title="WaiterMan POS API")
+# Create the main app without a prefix; responses are encoded with orjson
+app = FastAPI(title="WaiterMan POS API", default_response_class=ORJSONResponse)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
-# ============ ENUMS ============
-
-class TableStatus(str, Enum):
-    AVAILABLE = "available"
-    OCCUPIED = "occupied"
-    RESERVED = "reserved"
-
-class OrderStatus(str, Enum):
-    PENDING = "pending"
-    PREPARING = "preparing"
-    READY = "ready"
-    SERVED = "served"
-    COMPLETED = "completed"
-    CANCELLED = "cancelled"
-
-class PaymentStatus(str, Enum):
-    PENDING = "pending"
-    PAID = "paid"
-    FAILED = "failed"
-
-class OrderType(str, Enum):
-    DINE_IN = "dine_in"
-    TAKEAWAY = "takeaway"
-    DELIVERY = "delivery"
-
-# ============ AUTH MODELS ============
-
-class UserRegister(BaseModel):
-    email: EmailStr
-    password: str
-    name: str
-    role: str = UserRole.STAFF
-    restaurant_id: Optional[str] = None
-    branch_id: Optional[str] = None
-
-class UserLogin(BaseModel):
-    email: EmailStr
-    password: str
-
-class User(BaseModel):
-    model_config = ConfigDict(extra="ignore")
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    email: EmailStr
-    name: str
-    role: str
-    restaurant_id: Optional[str] = None
-    branch_id: Optional[str] = None
-    is_active: bool = True
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
-
-class TokenResponse(BaseModel):
-    access_token: str
-    token_type: str = "bearer"
-    user: User
-
-# ============ RESTAURANT & BRANCH MODELS ============
-
-class RestaurantCreate(BaseModel):
-    name: str
-    contact: Optional[str] = None
-    email: Optional[str] = None
-    address: Optional[str] = None
-
-class Restaurant(BaseModel):
-    model_config = ConfigDict(extra="ignore")
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    owner_id: str
-    name: str
-    contact: Optional[str] = None
-    email: Optional[str] = None
-    address: Optional[str] = None
-    is_active: bool = True
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
-
-class BranchCreate(BaseModel):
-    restaurant_id: str
-    name: str
-    location: Optional[str] = None
-    contact: Optional[str] = None
-
-class Branch(BaseModel):
-    model_config = ConfigDict(extra="ignore")
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    restaurant_id: str
-    name: str
-    location: Optional[str] = None
-    contact: Optional[str] = None
-    is_active: bool = True
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
-
-# ============ EXISTING MODELS (Categories, Menu, Tables, Orders) ============
-
-class CategoryCreate(BaseModel):
-    name: str
-    branch_id: str
-    status: bool = True
-
-class Category(BaseModel):
-    model_config = ConfigDict(extra="ignore")
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    branch_id: str
-    name: str
-    status: bool = True
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
-
-class SubCategoryCreate(BaseModel):
-    category_id: str
-    branch_id: str
-    name: str
-    status: bool = True
-
-class SubCategory(BaseModel):
-    model_config = ConfigDict(extra="ignore")
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    category_id: str
-    branch_id: str
-    name: str
-    status: bool = True
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
-
-class MenuItemCreate(BaseModel):
-    branch_id: str
-    category_id: str
-    sub_category_id: Optional[str] = None
-    name: str
-    description: Optional[str] = None
-    price: float
-    tax: float = 0.0
-    availability: bool = True
-    image_url: Optional[str] = None
-
-class MenuItem(BaseModel):
-    model_config = ConfigDict(extra="ignore")
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    branch_id: str
-    category_id: str
-    sub_category_id: Optional[str] = None
-    name: str
-    description: Optional[str] = None
-    price: float
-    tax: float = 0.0
-    availability: bool = True
-    image_url: Optional[str] = None
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
-
-class TableCreate(BaseModel):
-    branch_id: str
-    table_name: str
-    capacity: int
-
-class Table(BaseModel):
-    model_config = ConfigDict(extra="ignore")
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    branch_id: str
-    table_name: str
-    capacity: int
-    status: TableStatus = TableStatus.AVAILABLE
-    qr_url: Optional[str] = None
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
-
-class OrderItem(BaseModel):
-    item_id: str
-    item_name: str
-    quantity: int
-    price: float
-    tax: float = 0.0
-
-class OrderCreate(BaseModel):
-    branch_id: str
-    table_id: Optional[str] = None
-    order_type: OrderType = OrderType.DINE_IN
-    items: List[OrderItem]
-    customer_name: Optional[str] = None
-    customer_phone: Optional[str] = None
-
-class Order(BaseModel):
-    model_config = ConfigDict(extra="ignore")
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    branch_id: str
-    table_id: Optional[str] = None
-    order_type: OrderType = OrderType.DINE_IN
-    items: List[OrderItem]
-    customer_name: Optional[str] = None
-    customer_phone: Optional[str] = None
-    total_amount: float = 0.0
-    discount: float = 0.0
-    tax: float = 0.0
-    grand_total: float = 0.0
-    payment_status: PaymentStatus = PaymentStatus.PENDING
-    order_status: OrderStatus = OrderStatus.PENDING
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
-
-class OrderStatusUpdate(BaseModel):
-    order_status: OrderStatus
-
 # ============ UTILITY FUNCTIONS ============
 
-def generate_qr_code(data: str) -> str:
-    """Generate QR code and return as base64 string"""
-    qr = qrcode.QRCode(version=1, box_size=10, border=4)
-    qr.add_data(data)
-    qr.make(fit=True)
-    img = qr.make_image(fill_color="black", back_color="white")
-    
-    buffer = io.BytesIO()
-    img.save(buffer, format='PNG')
-    img_str = base64.b64encode(buffer.getvalue()).decode()
-    return f"data:image/png;base64,{img_str}"
+# Request bodies are validated by FastAPI on the way in, so the create
+# handlers build the stored models from them with model_construct (defaults
+# and id/created_at factories still apply) instead of validating twice.
+
+RESTAURANT_PROJECTION = model_projection(Restaurant)
+BRANCH_PROJECTION = model_projection(Branch)
+CATEGORY_PROJECTION = model_projection(Category)
+
+# Built once so validating a list is a single pydantic-core call, not one per row
+LIST_ADAPTERS = {model: TypeAdapter(List[model]) for model in (Restaurant, Branch, Category)}
+
+def from_db(model: type, doc: dict):
+    """Build a model from a stored document, validating only if enabled"""
+    if ENABLE_VALIDATION:
+        return model(**doc)
+    return model.model_construct(**doc)
+
+def rows_from_db(model: type, docs: list) -> list:
+    """Stored documents ready for ORJSONResponse, validated only if enabled"""
+    if ENABLE_VALIDATION:
+        adapter = LIST_ADAPTERS[model]
+        return adapter.dump_python(adapter.validate_python(docs))
+    return docs
 
 # ============ AUTHENTICATION ROUTES ============
 
 @api_router.post("/auth/register", response_model=User)
 async def register(user_data: UserRegister):
     """Register a new user"""
-    # Check if user already exists
-    existing_user = await db.users.find_one({"email": user_data.email})
-    if existing_user:
-        raise HTTPException(status_code=400, detail="Email already registered")
-    
     # Hash password
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash_async(user_data.password)
     
-    # Create user
-    user_obj = User(
+    # Create user (fields come from the validated request body)
+    user_obj = User.model_construct(
         email=user_data.email,
         name=user_data.name,
         role=user_data.role,
@@ -266,9 +83,12 @@ async def register(user_data: UserRegister):
     
     doc = user_obj.model_dump()
     doc['password'] = hashed_password
-    doc['created_at'] = doc['created_at'].isoformat()
     
-    await db.users.insert_one(doc)
+    # The unique email index rejects duplicates atomically, no lookup needed
+    try:
+        await db.users.insert_one(doc)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Email already registered")
     return user_obj
 
 @api_router.post("/auth/login", response_model=TokenResponse)
@@ -279,61 +99,62 @@ async def login(credentials: UserLogin):
     if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
-    # Verify password
-    if not verify_password(credentials.password, user['password']):
+    # Verify password, upgrading the stored hash if its cost setting changed
+    valid, new_hash = await verify_and_update_password_async(credentials.password, user['password'])
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    if new_hash:
+        await db.users.update_one({"id": user['id']}, {"$set": {"password": new_hash}})
     
     # Check if user is active
     if not user.get('is_active', True):
         raise HTTPException(status_code=401, detail="Account is deactivated")
     
+    # Remove password from response
+    user.pop('password', None)
+    
     # Create access token
     access_token = create_access_token(data={"sub": user['id'], "role": user['role']})
     
-    # Parse user object
-    if isinstance(user['created_at'], str):
-        user['created_at'] = datetime.fromisoformat(user['created_at'])
-    
-    # Remove password from response
-    user.pop('password', None)
-    user_obj = User(**user)
+    # Warm the user cache so the client's first authenticated call skips Mongo
+    cache_user(user)
+    user_obj = from_db(User, user)
     
     return TokenResponse(access_token=access_token, user=user_obj)
 
 @api_router.post("/auth/logout")
-async def logout():
-    """Logout user (client should delete token)"""
+async def logout(credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)):
+    """Logout user and revoke the presented token (client should delete it too)"""
+    if credentials:
+        await revoke_token(credentials.credentials)
     return {"message": "Logged out successfully"}
 
 @api_router.get("/auth/me", response_model=User)
-async def get_me(current_user: dict = Depends(lambda cred=Depends(None): get_current_user(cred, db))):
+async def get_me(current_user: CurrentUser):
     """Get current user info"""
-    if isinstance(current_user['created_at'], str):
-        current_user['created_at'] = datetime.fromisoformat(current_user['created_at'])
-    return User(**current_user)
+    return from_db(User, current_user)
 
 # ============ RESTAURANT ROUTES ============
 
 @api_router.post("/restaurants", response_model=Restaurant)
 async def create_restaurant(
     restaurant: RestaurantCreate,
-    current_user: dict = Depends(lambda cred=Depends(None): get_current_user(cred, db))
+    current_user: CurrentUser
 ):
     """Create a new restaurant (Super Admin only for now)"""
-    restaurant_obj = Restaurant(
+    restaurant_obj = Restaurant.model_construct(
         owner_id=current_user['id'],
-        **restaurant.model_dump()
+        **dict(restaurant)
     )
     
     doc = restaurant_obj.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
     
     await db.restaurants.insert_one(doc)
     return restaurant_obj
 
 @api_router.get("/restaurants", response_model=List[Restaurant])
 async def get_restaurants(
-    current_user: dict = Depends(lambda cred=Depends(None): get_current_user(cred, db))
+    current_user: CurrentUser
 ):
     """Get all restaurants for current user"""
     query = {}
@@ -341,39 +162,40 @@ async def get_restaurants(
         # Regular users can only see their own restaurants
         query['owner_id'] = current_user['id']
     
-    restaurants = await db.restaurants.find(query, {"_id": 0}).to_list(1000)
-    for rest in restaurants:
-        if isinstance(rest['created_at'], str):
-            rest['created_at'] = datetime.fromisoformat(rest['created_at'])
-    return restaurants
+    restaurants = await db.restaurants.find(query, RESTAURANT_PROJECTION).to_list(1000)
+    return ORJSONResponse(rows_from_db(Restaurant, restaurants))
 
 # ============ BRANCH ROUTES ============
 
 @api_router.post("/branches", response_model=Branch)
 async def create_branch(
     branch: BranchCreate,
-    current_user: dict = Depends(lambda cred=Depends(None): get_current_user(cred, db))
+    current_user: CurrentUser
 ):
     """Create a new branch"""
-    # Verify restaurant exists and user has access
-    restaurant = await db.restaurants.find_one({"id": branch.restaurant_id})
-    if not restaurant:
+    # Verify restaurant exists and user has access in one query by folding
+    # ownership into the filter for non-admins
+    query = {"id": branch.restaurant_id}
+    if current_user['role'] not in [UserRole.SUPER_ADMIN, UserRole.BRANCH_ADMIN]:
+        query['owner_id'] = current_user['id']
+    if not await db.restaurants.count_documents(query, limit=1):
+        # Only the failure path pays to tell "missing" from "not yours"
+        if 'owner_id' in query and await db.restaurants.count_documents({"id": branch.restaurant_id}, limit=1):
+            raise HTTPException(status_code=403, detail="Insufficient permissions")
         raise HTTPException(status_code=404, detail="Restaurant not found")
     
-    if current_user['role'] not in [UserRole.SUPER_ADMIN, UserRole.BRANCH_ADMIN] and restaurant['owner_id'] != current_user['id']:
-        raise HTTPException(status_code=403, detail="Insufficient permissions")
-    
-    branch_obj = Branch(**branch.model_dump())
+    branch_obj = Branch.model_construct(**dict(branch))
     doc = branch_obj.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
     
     await db.branches.insert_one(doc)
+    _list_cache.pop(("branches", branch.restaurant_id))
+    _list_cache.pop(("branches", None))
     return branch_obj
 
 @api_router.get("/branches", response_model=List[Branch])
 async def get_branches(
-    restaurant_id: Optional[str] = None,
-    current_user: dict = Depends(lambda cred=Depends(None): get_current_user(cred, db))
+    current_user: CurrentUser,
+    restaurant_id: Optional[str] = None
 ):
     """Get all branches"""
     query = {}
@@ -382,52 +204,60 @@ async def get_branches(
     elif current_user.get('restaurant_id'):
         query['restaurant_id'] = current_user['restaurant_id']
     
-    branches = await db.branches.find(query, {"_id": 0}).to_list(1000)
-    for branch in branches:
-        if isinstance(branch['created_at'], str):
-            branch['created_at'] = datetime.fromisoformat(branch['created_at'])
-    return branches
+    key = ("branches", query.get('restaurant_id'))
+    body = _list_cache.get(key)
+    if body is None:
+        branches = await db.branches.find(query, BRANCH_PROJECTION).to_list(1000)
+        body = json_dumps(rows_from_db(Branch, branches))
+        _list_cache.set(key, body)
+    return Response(content=body, media_type="application/json")
 
 @api_router.get("/branches/{branch_id}", response_model=Branch)
 async def get_branch(
     branch_id: str,
-    current_user: dict = Depends(lambda cred=Depends(None): get_current_user(cred, db))
+    current_user: CurrentUser
 ):
     """Get branch by ID"""
-    branch = await db.branches.find_one({"id": branch_id}, {"_id": 0})
+    branch = await db.branches.find_one({"id": branch_id}, BRANCH_PROJECTION)
     if not branch:
         raise HTTPException(status_code=404, detail="Branch not found")
     
-    if isinstance(branch['created_at'], str):
-        branch['created_at'] = datetime.fromisoformat(branch['created_at'])
-    return Branch(**branch)
+    return from_db(Branch, branch)
 
 # ============ CATEGORY ROUTES (Updated with branch_id) ============
 
 @api_router.post("/categories", response_model=Category)
 async def create_category(
     category: CategoryCreate,
-    current_user: dict = Depends(lambda cred=Depends(None): get_current_user(cred, db))
+    current_user: CurrentUser
 ):
     """Create category (requires authentication)"""
-    category_obj = Category(**category.model_dump())
+    category_obj = Category.model_construct(**dict(category))
     doc = category_obj.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
     await db.categories.insert_one(doc)
+    _list_cache.pop(("categories", category.branch_id))
+    _list_cache.pop(("categories", None))
     return category_obj
 
 @api_router.get("/categories", response_model=List[Category])
 async def get_categories(branch_id: Optional[str] = None):
     """Get categories (public endpoint for QR ordering)"""
-    query = {}
-    if branch_id:
-        query['branch_id'] = branch_id
-    
-    categories = await db.categories.find(query, {"_id": 0}).to_list(1000)
-    for cat in categories:
-        if isinstance(cat['created_at'], str):
-            cat['created_at'] = datetime.fromisoformat(cat['created_at'])
-    return categories
+    key = ("categories", branch_id or None)
+    body = _list_cache.get(key)
+    if body is None:
+        query = {}
+        if branch_id:
+            query['branch_id'] = branch_id
+        
+        categories = await db.categories.find(query, CATEGORY_PROJECTION).to_list(1000)
+        body = json_dumps(rows_from_db(Category, categories))
+        _list_cache.set(key, body)
+    # Public and rarely edited, so QR-ordering clients may reuse it briefly
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"Cache-Control": "public, max-age=30, stale-while-revalidate=60"}
+    )
 
 # ============ REST OF THE ENDPOINTS FOLLOW SIMILAR PATTERN ============
 # Note: I'll continue with essential endpoints. Full implementation would include all CRUD operations
@@ -443,6 +273,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# List responses are large, repetitive JSON; compress anything over 1 KB
+app.add_middleware(GZipMiddleware, minimum_size=1000)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -450,6 +283,13 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def create_indexes():
+    try:
+        await ensure_indexes(db)
+    except Exception:
+        logger.exception("Failed to create MongoDB indexes")
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
+    get_client().close()
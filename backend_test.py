@@ -1,4 +1,5 @@
-import requests
+import asyncio
+import httpx
 import sys
 import json
 from datetime import datetime
@@ -16,11 +17,24 @@ class WaiterManAPITester:
             'tables': [],
             'orders': []
         }
+        self.client = None
+
+    async def __aenter__(self):
+        # One keep-alive client for every test so requests reuse connections
+        # (HTTP/1.1: http2=True would need the optional h2 package)
+        self.client = httpx.AsyncClient(
+            base_url=self.api_url,
+            headers={'Content-Type': 'application/json'},
+            timeout=30,
+        )
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.client.aclose()
 
-    def run_test(self, name, method, endpoint, expected_status, data=None, params=None):
+    async def run_test(self, name, method, endpoint, expected_status, data=None, params=None):
         """Run a single API test"""
         url = f"{self.api_url}/{endpoint}"
-        headers = {'Content-Type': 'application/json'}
 
         self.tests_run += 1
         print(f"\n🔍 Testing {name}...")
@@ -29,16 +43,9 @@ class WaiterManAPITester:
             print(f"   Data: {json.dumps(data, indent=2)}")
         
         try:
-            if method == 'GET':
-                response = requests.get(url, headers=headers, params=params)
-            elif method == 'POST':
-                response = requests.post(url, json=data, headers=headers)
-            elif method == 'PUT':
-                response = requests.put(url, json=data, headers=headers)
-            elif method == 'PATCH':
-                response = requests.patch(url, json=data, headers=headers)
-            elif method == 'DELETE':
-                response = requests.delete(url, headers=headers)
+            response = await self.client.request(
+                method, f"/{endpoint}", json=data, params=params
+            )
 
             success = response.status_code == expected_status
             if success:
@@ -64,9 +71,9 @@ class WaiterManAPITester:
             print(f"❌ Failed - Error: {str(e)}")
             return False, {}
 
-    def test_dashboard_stats(self):
+    async def test_dashboard_stats(self):
         """Test dashboard stats endpoint"""
-        success, response = self.run_test(
+        success, response = await self.run_test(
             "Dashboard Stats",
             "GET",
             "dashboard/stats",
@@ -83,10 +90,10 @@ class WaiterManAPITester:
             print(f"   Dashboard stats: {response}")
         return success
 
-    def test_categories_crud(self):
+    async def test_categories_crud(self):
         """Test category CRUD operations"""
         # Create category
-        success, response = self.run_test(
+        success, response = await self.run_test(
             "Create Category",
             "POST",
             "categories",
@@ -100,7 +107,7 @@ class WaiterManAPITester:
         self.created_ids['categories'].append(category_id)
 
         # Get categories
-        success, response = self.run_test(
+        success, response = await self.run_test(
             "Get Categories",
             "GET",
             "categories",
@@ -110,7 +117,7 @@ class WaiterManAPITester:
             return False
 
         # Update category
-        success, response = self.run_test(
+        success, response = await self.run_test(
             "Update Category",
             "PUT",
             f"categories/{category_id}",
@@ -122,7 +129,7 @@ class WaiterManAPITester:
 
         return True
 
-    def test_subcategories_crud(self):
+    async def test_subcategories_crud(self):
         """Test subcategory CRUD operations"""
         if not self.created_ids['categories']:
             print("❌ No categories available for subcategory test")
@@ -131,7 +138,7 @@ class WaiterManAPITester:
         category_id = self.created_ids['categories'][0]
         
         # Create subcategory
-        success, response = self.run_test(
+        success, response = await self.run_test(
             "Create Subcategory",
             "POST",
             "subcategories",
@@ -145,7 +152,7 @@ class WaiterManAPITester:
         self.created_ids['subcategories'].append(subcategory_id)
 
         # Get subcategories
-        success, response = self.run_test(
+        success, response = await self.run_test(
             "Get Subcategories",
             "GET",
             "subcategories",
@@ -156,7 +163,7 @@ class WaiterManAPITester:
 
         return True
 
-    def test_menu_items_crud(self):
+    async def test_menu_items_crud(self):
         """Test menu item CRUD operations"""
         if not self.created_ids['categories']:
             print("❌ No categories available for menu item test")
@@ -165,7 +172,7 @@ class WaiterManAPITester:
         category_id = self.created_ids['categories'][0]
         
         # Create menu item
-        success, response = self.run_test(
+        success, response = await self.run_test(
             "Create Menu Item",
             "POST",
             "menu/item",
@@ -186,7 +193,7 @@ class WaiterManAPITester:
         self.created_ids['menu_items'].append(menu_item_id)
 
         # Get menu items
-        success, response = self.run_test(
+        success, response = await self.run_test(
             "Get Menu Items",
             "GET",
             "menu/items",
@@ -196,7 +203,7 @@ class WaiterManAPITester:
             return False
 
         # Get available menu items only
-        success, response = self.run_test(
+        success, response = await self.run_test(
             "Get Available Menu Items",
             "GET",
             "menu/items",
@@ -208,10 +215,73 @@ class WaiterManAPITester:
 
         return True
 
-    def test_tables_crud(self):
+    async def test_bulk_create(self):
+        """Test bulk subcategory and menu item creation"""
+        if not self.created_ids['categories']:
+            print("❌ No categories available for bulk create test")
+            return False
+
+        category_id = self.created_ids['categories'][0]
+        pricing = {"dine_in": 49.99, "takeaway": 44.99}
+
+        # Create subcategories in one request
+        success, response = await self.run_test(
+            "Bulk Create Subcategories",
+            "POST",
+            "subcategories/bulk",
+            200,
+            data=[
+                {"category_id": category_id, "name": "Bulk Subcategory 1"},
+                {"category_id": category_id, "name": "Bulk Subcategory 2"}
+            ]
+        )
+        if not success or len(response) != 2:
+            return False
+        self.created_ids['subcategories'].extend(sub['id'] for sub in response)
+
+        # Create menu items in one request
+        success, response = await self.run_test(
+            "Bulk Create Menu Items",
+            "POST",
+            "menu/items/bulk",
+            200,
+            data=[
+                {"category_id": category_id, "name": "Bulk Item 1", "pricing": pricing},
+                {"category_id": category_id, "name": "Bulk Item 2", "pricing": pricing}
+            ]
+        )
+        if not success or len(response) != 2:
+            return False
+        self.created_ids['menu_items'].extend(item['id'] for item in response)
+
+        # An unknown category rejects the whole batch
+        success, _ = await self.run_test(
+            "Bulk Create With Unknown Category",
+            "POST",
+            "menu/items/bulk",
+            404,
+            data=[
+                {"category_id": category_id, "name": "Bulk Item 3", "pricing": pricing},
+                {"category_id": "no-such-category", "name": "Bulk Item 4", "pricing": pricing}
+            ]
+        )
+        if not success:
+            return False
+
+        # Invalid items fail validation
+        success, _ = await self.run_test(
+            "Bulk Create With Invalid Item",
+            "POST",
+            "subcategories/bulk",
+            422,
+            data=[{"category_id": category_id}]
+        )
+        return success
+
+    async def test_tables_crud(self):
         """Test table CRUD operations"""
         # Create table
-        success, response = self.run_test(
+        success, response = await self.run_test(
             "Create Table",
             "POST",
             "tables",
@@ -235,7 +305,7 @@ class WaiterManAPITester:
         print(f"   QR code generated: {response['qr_url'][:50]}...")
 
         # Get tables
-        success, response = self.run_test(
+        success, response = await self.run_test(
             "Get Tables",
             "GET",
             "tables",
@@ -245,7 +315,7 @@ class WaiterManAPITester:
             return False
 
         # Get specific table
-        success, response = self.run_test(
+        success, response = await self.run_test(
             "Get Specific Table",
             "GET",
             f"tables/{table_id}",
@@ -255,7 +325,7 @@ class WaiterManAPITester:
             return False
 
         # Get table QR code
-        success, response = self.run_test(
+        success, response = await self.run_test(
             "Get Table QR Code",
             "GET",
             f"tables/{table_id}/qr",
@@ -266,7 +336,7 @@ class WaiterManAPITester:
 
         return True
 
-    def test_orders_crud(self):
+    async def test_orders_crud(self):
         """Test order CRUD operations"""
         if not self.created_ids['tables'] or not self.created_ids['menu_items']:
             print("❌ No tables or menu items available for order test")
@@ -276,7 +346,7 @@ class WaiterManAPITester:
         menu_item_id = self.created_ids['menu_items'][0]
         
         # Create order
-        success, response = self.run_test(
+        success, response = await self.run_test(
             "Create Order",
             "POST",
             "orders",
@@ -317,7 +387,7 @@ class WaiterManAPITester:
             return False
 
         # Get orders
-        success, response = self.run_test(
+        success, response = await self.run_test(
             "Get Orders",
             "GET",
             "orders",
@@ -327,7 +397,7 @@ class WaiterManAPITester:
             return False
 
         # Get specific order
-        success, response = self.run_test(
+        success, response = await self.run_test(
             "Get Specific Order",
             "GET",
             f"orders/{order_id}",
@@ -337,7 +407,7 @@ class WaiterManAPITester:
             return False
 
         # Update order status
-        success, response = self.run_test(
+        success, response = await self.run_test(
             "Update Order Status to Preparing",
             "PATCH",
             f"orders/{order_id}/status",
@@ -348,7 +418,7 @@ class WaiterManAPITester:
             return False
 
         # Update order status to completed (should free table)
-        success, response = self.run_test(
+        success, response = await self.run_test(
             "Update Order Status to Completed",
             "PATCH",
             f"orders/{order_id}/status",
@@ -360,96 +430,78 @@ class WaiterManAPITester:
 
         return True
 
-    def cleanup(self):
+    async def _delete_quietly(self, path):
+        """DELETE a test resource, ignoring any failure"""
+        try:
+            await self.client.delete(path)
+        except httpx.HTTPError:
+            pass
+
+    async def cleanup(self):
         """Clean up created test data"""
         print("\n🧹 Cleaning up test data...")
         
-        # Delete orders
-        for order_id in self.created_ids['orders']:
-            try:
-                requests.delete(f"{self.api_url}/orders/{order_id}")
-            except:
-                pass
-
-        # Delete menu items
-        for item_id in self.created_ids['menu_items']:
-            try:
-                requests.delete(f"{self.api_url}/menu/item/{item_id}")
-            except:
-                pass
-
-        # Delete subcategories
-        for sub_id in self.created_ids['subcategories']:
-            try:
-                requests.delete(f"{self.api_url}/subcategories/{sub_id}")
-            except:
-                pass
-
-        # Delete categories
-        for cat_id in self.created_ids['categories']:
-            try:
-                requests.delete(f"{self.api_url}/categories/{cat_id}")
-            except:
-                pass
-
-        # Delete tables
-        for table_id in self.created_ids['tables']:
-            try:
-                requests.delete(f"{self.api_url}/tables/{table_id}")
-            except:
-                pass
-
-def main():
+        # The API has no cross-collection constraints on delete, so every
+        # resource can be removed concurrently
+        await asyncio.gather(
+            *[self._delete_quietly(f"/orders/{order_id}") for order_id in self.created_ids['orders']],
+            *[self._delete_quietly(f"/menu/item/{item_id}") for item_id in self.created_ids['menu_items']],
+            *[self._delete_quietly(f"/subcategories/{sub_id}") for sub_id in self.created_ids['subcategories']],
+            *[self._delete_quietly(f"/categories/{cat_id}") for cat_id in self.created_ids['categories']],
+            *[self._delete_quietly(f"/tables/{table_id}") for table_id in self.created_ids['tables']],
+        )
+
+async def run_stage(tests):
+    """Run independent (label, coroutine) tests concurrently; False if any failed"""
+    results = await asyncio.gather(*(test for _, test in tests))
+    for (label, _), passed in zip(tests, results):
+        if not passed:
+            print(f"❌ {label} test failed")
+            return False
+    return True
+
+async def main():
     print("🚀 Starting WaiterMan POS API Tests")
     print("=" * 50)
     
-    tester = WaiterManAPITester()
-    
-    try:
-        # Test dashboard stats first
-        if not tester.test_dashboard_stats():
-            print("❌ Dashboard stats test failed")
-            return 1
-
-        # Test categories
-        if not tester.test_categories_crud():
-            print("❌ Categories CRUD test failed")
-            return 1
-
-        # Test subcategories
-        if not tester.test_subcategories_crud():
-            print("❌ Subcategories CRUD test failed")
-            return 1
-
-        # Test menu items
-        if not tester.test_menu_items_crud():
-            print("❌ Menu items CRUD test failed")
-            return 1
-
-        # Test tables
-        if not tester.test_tables_crud():
-            print("❌ Tables CRUD test failed")
-            return 1
-
-        # Test orders
-        if not tester.test_orders_crud():
-            print("❌ Orders CRUD test failed")
-            return 1
-
-        # Print final results
-        print("\n" + "=" * 50)
-        print(f"📊 Final Results: {tester.tests_passed}/{tester.tests_run} tests passed")
+    async with WaiterManAPITester() as tester:
+        try:
+            # Dashboard, categories and tables don't depend on each other
+            if not await run_stage([
+                ("Dashboard stats", tester.test_dashboard_stats()),
+                ("Categories CRUD", tester.test_categories_crud()),
+                ("Tables CRUD", tester.test_tables_crud()),
+            ]):
+                return 1
+
+            # Subcategories, menu items and bulk creates all need a category
+            if not await run_stage([
+                ("Subcategories CRUD", tester.test_subcategories_crud()),
+                ("Menu items CRUD", tester.test_menu_items_crud()),
+                ("Bulk create", tester.test_bulk_create()),
+            ]):
+                return 1
+
+            # Orders need a table and a menu item
+            if not await run_stage([
+                ("Orders CRUD", tester.test_orders_crud()),
+            ]):
+                return 1
+
+            # Print final results
+            print("\n" + "=" * 50)
+            print(f"📊 Final Results: {tester.tests_passed}/{tester.tests_run} tests passed")
         
-        if tester.tests_passed == tester.tests_run:
-            print("🎉 All tests passed!")
-            return 0
-        else:
-            print("❌ Some tests failed")
-            return 1
+            if tester.tests_passed == tester.tests_run:
+                print("🎉 All tests passed!")
+                return 0
+            else:
+                print("❌ Some tests failed")
+                return 1
 
-    finally:
-        # Always cleanup
-        tester.cleanup()
+        finally:
+            # Always cleanup
+            await tester.cleanup()
 
 if __name__ == "__main__":
-    sys.exit(main())
\ No newline at end of file
+    sys.exit(asyncio.run(main()))
@@ -750,7 +750,7 @@ export default function POSScreen() {
           <div className="flex flex-col items-center py-4">
             {selectedQrTable?.qr_url ? (
               <>
-                <img src={selectedQrTable.qr_url} alt="QR Code" className="w-64 h-64" />
+                <img src={`${BACKEND_URL}${selectedQrTable.qr_url}`} alt="QR Code" className="w-64 h-64" />
                 <p className="text-sm text-gray-600 mt-4 text-center">
                   Customers can scan this QR code to place orders directly
                 </p>
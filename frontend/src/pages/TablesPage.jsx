@@ -160,7 +160,7 @@ export default function TablesPage() {
                     data-testid="view-qr-button"
                     variant="outline"
                     size="sm"
-                    onClick={() => showQr(table.qr_url)}
+                    onClick={() => showQr(`${BACKEND_URL}${table.qr_url}`)}
                     className="flex-1"
                   >
                     <QrCode size={16} className="mr-2" />
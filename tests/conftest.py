@@ -0,0 +1,61 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# The backend modules import each other by flat name, as when run from backend/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend'))
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'waiterman_test')
+
+# Run the API against an in-memory MongoDB; must be patched before the app
+# creates its shared client
+mongomock_motor = pytest.importorskip('mongomock_motor')
+import dependencies  # noqa: E402
+
+dependencies.AsyncIOMotorClient = mongomock_motor.AsyncMongoMockClient
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import auth  # noqa: E402
+import server  # noqa: E402
+import server_auth  # noqa: E402
+
+
+async def _empty_collections(db):
+    for name in await db.list_collection_names():
+        await db[name].delete_many({})
+
+
+def _test_client(app):
+    for cache in (
+        server._menu_cache, server_auth._list_cache,
+        auth._token_cache, auth._user_cache, auth._revocation_cache,
+    ):
+        cache.clear()
+    with TestClient(app) as test_client:
+        test_client.portal.call(_empty_collections, server.db)
+        yield test_client
+
+
+@pytest.fixture
+def client():
+    """TestClient for server.app on an empty database with cold caches"""
+    yield from _test_client(server.app)
+
+
+@pytest.fixture
+def auth_client():
+    """TestClient for server_auth.app on an empty database with cold caches"""
+    yield from _test_client(server_auth.app)
+
+
+@pytest.fixture
+def admin_headers(client):
+    """Authorization header of a freshly registered super admin"""
+    client.post('/api/auth/register', json={
+        'email': 'admin@example.com', 'password': 'secret', 'name': 'Admin', 'role': 'super_admin',
+    })
+    response = client.post('/api/auth/login', json={'email': 'admin@example.com', 'password': 'secret'})
+    return {'Authorization': f"Bearer {response.json()['access_token']}"}
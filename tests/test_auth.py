@@ -0,0 +1,100 @@
+import pytest
+
+import auth
+import server
+
+
+def login(client, email='admin@example.com', password='secret'):
+    response = client.post('/api/auth/login', json={'email': email, 'password': password})
+    assert response.status_code == 200, response.text
+    return response.json()['access_token']
+
+
+def bearer(token):
+    return {'Authorization': f'Bearer {token}'}
+
+
+def test_logout_revokes_only_that_token(client, admin_headers):
+    token, other = login(client), login(client)
+    assert client.get('/api/auth/me', headers=bearer(token)).status_code == 200
+
+    assert client.post('/api/auth/logout', headers=bearer(token)).status_code == 200
+    assert client.get('/api/auth/me', headers=bearer(token)).status_code == 401
+    assert client.get('/api/auth/me', headers=bearer(other)).status_code == 200
+
+
+def test_revocation_reaches_workers_with_a_cached_token(client, admin_headers):
+    token = login(client)
+    assert client.get('/api/auth/me', headers=bearer(token)).status_code == 200
+    payload = auth._token_cache.get(token)
+
+    client.post('/api/auth/logout', headers=bearer(token))
+    stored = client.portal.call(server.db.revoked_tokens.find_one, {'jti': payload['jti']})
+    assert stored is not None and stored['expires_at'] is not None
+
+    # Another worker: the token is still in its verified-token cache and its
+    # cached revocation answer has expired
+    auth._revocation_cache.clear()
+    auth._token_cache.set(token, payload)
+    response = client.get('/api/auth/me', headers=bearer(token))
+    assert response.status_code == 401
+    assert response.json()['detail'] == 'Token has been revoked'
+
+
+def test_not_revoked_answer_is_cached_briefly(client, admin_headers):
+    token = login(client)
+    assert client.get('/api/auth/me', headers=bearer(token)).status_code == 200
+    jti = auth._token_cache.get(token)['jti']
+    assert auth._revocation_cache.get(jti) is False
+
+    # Revoked elsewhere: this worker keeps its cached answer until it expires
+    client.portal.call(server.db.revoked_tokens.insert_one, {'jti': jti})
+    assert client.get('/api/auth/me', headers=bearer(token)).status_code == 200
+    auth._revocation_cache.pop(jti)
+    assert client.get('/api/auth/me', headers=bearer(token)).status_code == 401
+
+
+def test_login_checks_the_stored_password(client, admin_headers):
+    login(client)
+    # Changed by another worker (or directly in the database)
+    new_hash = auth.get_password_hash('changed')
+    client.portal.call(server.db.users.update_one, {'email': 'admin@example.com'}, {'$set': {'password': new_hash}})
+
+    response = client.post('/api/auth/login', json={'email': 'admin@example.com', 'password': 'secret'})
+    assert response.status_code == 401
+    login(client, password='changed')
+
+
+def test_login_rejects_deactivated_users(client, admin_headers):
+    login(client)
+    client.portal.call(server.db.users.update_one, {'email': 'admin@example.com'}, {'$set': {'is_active': False}})
+
+    response = client.post('/api/auth/login', json={'email': 'admin@example.com', 'password': 'secret'})
+    assert response.status_code == 401
+    assert response.json()['detail'] == 'Account is deactivated'
+
+
+@pytest.mark.parametrize('app_client', ['client', 'auth_client'])
+def test_login_upgrades_costlier_hashes(app_client, request):
+    client = request.getfixturevalue(app_client)
+    legacy_hash = auth.pwd_context.hash('secret', rounds=auth.BCRYPT_ROUNDS + 1)
+    client.portal.call(server.db.users.insert_one, {
+        'id': 'u1', 'email': 'admin@example.com', 'name': 'Admin', 'role': 'super_admin',
+        'is_active': True, 'password': legacy_hash,
+    })
+
+    login(client)
+    user = client.portal.call(server.db.users.find_one, {'email': 'admin@example.com'})
+    assert user['password'] != legacy_hash
+    assert not auth.pwd_context.needs_update(user['password'])
+
+
+@pytest.mark.parametrize('app_client', ['client', 'auth_client'])
+def test_logout_revokes_on_both_apps(app_client, request):
+    client = request.getfixturevalue(app_client)
+    client.post('/api/auth/register', json={'email': 'staff@example.com', 'password': 'pw', 'name': 'Staff'})
+    token = login(client, email='staff@example.com', password='pw')
+
+    assert client.post('/api/auth/logout', headers=bearer(token)).status_code == 200
+    assert client.get('/api/auth/me', headers=bearer(token)).status_code == 401
+    assert client.post('/api/auth/logout').status_code == 200
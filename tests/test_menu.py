@@ -0,0 +1,50 @@
+import server
+
+
+def create_category(client, name='Drinks'):
+    return client.post('/api/categories', json={'name': name}).json()['id']
+
+
+def menu_item(category_id, name):
+    return {'category_id': category_id, 'name': name, 'pricing': {'dine_in': 2.5, 'takeaway': 2.0}}
+
+
+def test_bulk_create_subcategories(client):
+    category_id = create_category(client)
+    response = client.post('/api/subcategories/bulk', json=[
+        {'category_id': category_id, 'name': 'Hot'},
+        {'category_id': category_id, 'name': 'Cold'},
+    ])
+    assert response.status_code == 200
+    assert [sub['name'] for sub in response.json()] == ['Hot', 'Cold']
+    assert len(client.get('/api/subcategories', params={'category_id': category_id}).json()) == 2
+
+
+def test_bulk_create_menu_items(client):
+    category_id = create_category(client)
+    response = client.post('/api/menu/items/bulk', json=[menu_item(category_id, 'Tea'), menu_item(category_id, 'Coffee')])
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+    assert len(client.get('/api/menu/items').json()) == 2
+
+
+def test_bulk_create_rejects_unknown_category_atomically(client):
+    category_id = create_category(client)
+    response = client.post('/api/menu/items/bulk', json=[menu_item(category_id, 'Tea'), menu_item('missing', 'Coffee')])
+    assert response.status_code == 404
+    assert 'missing' in response.json()['detail']
+    assert client.get('/api/menu/items').json() == []
+
+
+def test_bulk_create_rejects_invalid_items(client):
+    category_id = create_category(client)
+    response = client.post('/api/menu/items/bulk', json=[menu_item(category_id, 'Tea'), {'category_id': category_id}])
+    assert response.status_code == 422
+    assert client.get('/api/menu/items').json() == []
+
+
+def test_bulk_create_is_capped(client):
+    category_id = create_category(client)
+    too_many = [{'category_id': category_id, 'name': f'S{i}'} for i in range(server.MAX_BULK_ITEMS + 1)]
+    assert client.post('/api/subcategories/bulk', json=too_many).status_code == 422
+    assert client.get('/api/subcategories').json() == []
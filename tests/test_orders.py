@@ -0,0 +1,69 @@
+import inspect
+from datetime import datetime, timezone
+
+from fastapi import BackgroundTasks
+
+import server
+
+
+def test_completing_order_frees_table(client, monkeypatch):
+    scheduled = []
+    add_task = BackgroundTasks.add_task
+
+    def record_task(self, func, *args, **kwargs):
+        scheduled.append(func)
+        add_task(self, func, *args, **kwargs)
+
+    monkeypatch.setattr(BackgroundTasks, 'add_task', record_task)
+
+    table_id = client.post('/api/tables', json={'table_name': 'T1', 'capacity': 4}).json()['id']
+    order = client.post('/api/orders', json={
+        'table_id': table_id,
+        'items': [{'item_id': 'i1', 'item_name': 'Tea', 'quantity': 2, 'price': 3.0}],
+    }).json()
+    assert client.get(f'/api/tables/{table_id}').json()['status'] == 'occupied'
+
+    response = client.patch(f"/api/orders/{order['id']}/status", json={'order_status': 'completed'})
+    assert response.status_code == 200
+    assert response.json()['order_status'] == 'completed'
+    assert client.get(f'/api/tables/{table_id}').json()['status'] == 'available'
+
+    # Real Motor methods are not coroutine functions, so Starlette would run
+    # them in a thread without an event loop; only our own coroutine
+    # functions may be scheduled (the in-memory client here hides that)
+    assert scheduled
+    for func in scheduled:
+        assert inspect.iscoroutinefunction(func) and not inspect.ismethod(func), func
+
+
+def test_other_status_keeps_table_occupied(client):
+    table_id = client.post('/api/tables', json={'table_name': 'T1', 'capacity': 4}).json()['id']
+    order = client.post('/api/orders', json={
+        'table_id': table_id,
+        'items': [{'item_id': 'i1', 'item_name': 'Tea', 'quantity': 1, 'price': 3.0}],
+    }).json()
+
+    client.patch(f"/api/orders/{order['id']}/status", json={'order_status': 'preparing'})
+    assert client.get(f'/api/tables/{table_id}').json()['status'] == 'occupied'
+
+
+def test_order_pages_do_not_overlap_on_equal_timestamps(client):
+    created_at = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    orders = [{'id': f'o{i}', 'items': [], 'created_at': created_at} for i in range(5)]
+    client.portal.call(server.db.orders.insert_many, orders)
+
+    seen = []
+    for offset in range(0, 5, 2):
+        page = client.get('/api/orders', params={'limit': 2, 'offset': offset}).json()
+        seen += [order['id'] for order in page]
+    assert sorted(seen) == [order['id'] for order in orders]
+
+
+def test_table_qr_is_versioned_and_sent_uncompressed(client):
+    table = client.post('/api/tables', json={'table_name': 'T1', 'capacity': 4}).json()
+    assert table['qr_url'] == f"/api/tables/{table['id']}/qr?v={server.QR_VERSION}"
+
+    response = client.get(table['qr_url'], headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert response.headers['content-encoding'] == 'identity'
+    assert response.content.startswith(b'\x89PNG')
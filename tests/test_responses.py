@@ -0,0 +1,14 @@
+import pytest
+
+
+@pytest.mark.parametrize('path, body', [
+    ('/api/categories', {'name': 'Drinks'}),
+    ('/api/tables', {'table_name': 'T1', 'capacity': 2}),
+    ('/api/orders', {'items': [{'item_id': 'i1', 'item_name': 'Tea', 'quantity': 1, 'price': 3.0}]}),
+])
+def test_list_and_model_responses_share_datetime_format(client, path, body):
+    created = client.post(path, json=body).json()
+    listed = client.get(path).json()
+
+    assert created['created_at'].endswith('Z')
+    assert listed == [created]